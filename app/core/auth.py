@@ -1,10 +1,17 @@
+import asyncio
+import hashlib
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from typing import Any, Dict, Optional, Set
 
-from app.core.security import decode_access_token
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup, track
+from app.core.security import InvalidTokenError, decode_access_token
 from app.db.database import get_db
 from app.repositories.user_repository import UserRepository
 from app.models.models import User
@@ -16,45 +23,222 @@ and user identification.
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_current_user(
+# Cache namespace for verified tokens
+TOKEN_CACHE_NAMESPACE = "auth_tokens"
+
+# Session.info key collecting the IDs of users deleted in the transaction
+DELETED_USERS_INFO_KEY = "deleted_user_ids"
+
+# Token invalidations scheduled from session events, kept until they finish
+_forget_tasks: Set["asyncio.Task"] = set()
+
+class Principal:
+    """
+    Lightweight identity of an authenticated user.
+    
+    Attributes:
+        id (int): ID of the user
+        email (str): Email address of the user
+        claims (Dict): Verified claims of the token the user presented
+    """
+    __slots__ = ("id", "email", "claims")
+    
+    def __init__(self, id: int, email: str, claims: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.email = email
+        self.claims = claims or {}
+        
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id!r}, email={self.email!r})"
+
+
+def token_cache_key(token: str) -> str:
+    """
+    Return the cache key for a token.
+    
+    Only a digest of the token is used, so the cache never holds usable credentials.
+    
+    Args:
+        token (str): JWT token
+        
+    Returns:
+        str: Cache key
+    """
+    return f"{TOKEN_CACHE_NAMESPACE}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def token_tag(user_id: int) -> str:
+    """
+    Return the cache tag for the verified tokens of a user.
+    
+    Kept apart from ``user_tag`` so that changes to a user's posts do not
+    evict their tokens.
+    
+    Args:
+        user_id (int): ID of the user
+        
+    Returns:
+        str: Cache tag
+    """
+    return f"token:{user_id}"
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def forget_user_tokens(user_id: int) -> None:
+    """
+    Drop the cached tokens of a user, so they are verified against the database again.
+    
+    Deleting a user through the ORM does this automatically once the
+    transaction commits. Code that removes users otherwise, e.g. with a bulk
+    ``delete()`` statement, should call it after committing; if it doesn't,
+    the user's tokens keep working for up to ``AUTH_TOKEN_CACHE_SECONDS``.
+    
+    Args:
+        user_id (int): ID of the user
+    """
+    await cache.ainvalidate_tags(token_tag(user_id))
+
+
+@event.listens_for(User, "after_delete")
+def _collect_deleted_user(mapper, connection, target: User) -> None:
+    # The row is only gone once the transaction commits: invalidating now would
+    # let a concurrent request re-cache the token from the still visible row
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(DELETED_USERS_INFO_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deleted_users(session: Session) -> None:
+    session.info.pop(DELETED_USERS_INFO_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_deleted_users(session: Session) -> None:
+    user_ids = session.info.pop(DELETED_USERS_INFO_KEY, None)
+    if not user_ids:
+        return
+        
+    # Session events are synchronous. On the event loop the invalidation is
+    # scheduled rather than run, so a slow shared cache can't block the loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        cache.invalidate_tags(*(token_tag(user_id) for user_id in user_ids))
+        return
+    for user_id in user_ids:
+        task = loop.create_task(forget_user_tokens(user_id))
+        _forget_tasks.add(task)
+        task.add_done_callback(_forget_tasks.discard)
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
     """
     Dependency to get the current authenticated user from a token.
     
+    A verified token is cached until it expires, for at most
+    ``AUTH_TOKEN_CACHE_SECONDS``, so repeat requests with the same token skip
+    decoding it and loading the user. Deleting a user drops their cached tokens
+    from the configured cache backend; a worker that doesn't share that cache
+    (``CACHE_BACKEND=memory`` with several workers) keeps accepting them until
+    its entry ages out.
+    
     Args:
         token (str): JWT token from the request
-        db (Session): Database session
+        db (AsyncSession): Database session
         
     Returns:
-        User: The authenticated user
+        Principal: The authenticated user
         
     Raises:
         HTTPException: If the token is invalid or the user doesn't exist
     """
+    with track("auth"):
+        return await _authenticate(token, db)
+
+
+async def _authenticate(token: str, db: AsyncSession) -> Principal:
+    credentials_exception = _credentials_exception()
     
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+    cache_key = token_cache_key(token)
+    hit, cached = await cache.aget(cache_key, TOKEN_CACHE_NAMESPACE)
+    record_cache_lookup(TOKEN_CACHE_NAMESPACE, "hit" if hit else "miss")
+    if hit:
+        return Principal(cached["id"], cached["email"], cached["claims"])
     
     try:
         payload = decode_access_token(token)
-        user_id: Optional[int] = payload.get("sub")
-        
-        if user_id is None:
-            raise credentials_exception
-            
-    except JWTError:
+        user_id = int(payload["sub"])
+    except (InvalidTokenError, KeyError, TypeError, ValueError):
         raise credentials_exception
         
+    # Read before the user, so a deletion in between keeps the token uncached
+    generations = await cache.atag_generations((token_tag(user_id),))
+    
     user_repo = UserRepository(db)
-    user = user_repo.get_user_by_id(user_id)
+    user = await user_repo.get_user_by_id(user_id)
     
     if user is None:
         raise credentials_exception
         
-    return user
+    expires_at = payload.get("exp")
+    if generations is not None and isinstance(expires_at, (int, float)) and expires_at > time.time():
+        await cache.aset(
+            cache_key,
+            {"id": user.id, "email": user.email, "claims": payload},
+            min(expires_at - time.time(), settings.AUTH_TOKEN_CACHE_SECONDS),
+            TOKEN_CACHE_NAMESPACE,
+            (token_tag(user.id),),
+            generations,
+        )
+        
+    return Principal(user.id, user.email, payload)
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Dependency to get the current principal for endpoints that only need its identity.
+    
+    With ``settings.AUTH_STATELESS`` the principal is built from the claims of
+    the verified token, so no database query is made for authentication.
+    Otherwise, and for tokens issued without an email claim, this is the same
+    as ``get_current_user``.
+    
+    Args:
+        token (str): JWT token from the request
+        db (AsyncSession): Database session
+        
+    Returns:
+        Principal: The authenticated user
+        
+    Raises:
+        HTTPException: If the token is invalid
+    """
+    with track("auth"):
+        if not settings.AUTH_STATELESS:
+            return await _authenticate(token, db)
+            
+        try:
+            payload = decode_access_token(token)
+            user_id = int(payload["sub"])
+        except (InvalidTokenError, KeyError, TypeError, ValueError):
+            raise _credentials_exception()
+            
+        email = payload.get("email")
+        if email is None:
+            return await _authenticate(token, db)
+            
+        return Principal(user_id, email, payload)
@@ -0,0 +1,116 @@
+from typing import Dict, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException
+from starlette.status import HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+"""
+This module limits the size of request bodies before they are parsed.
+
+``BodySizeLimitMiddleware`` rejects a request whose ``Content-Length`` is over
+the limit of its route without reading the body, and counts the bytes of
+bodies sent without a length (chunked), stopping as soon as the limit is
+passed. Since FastAPI buffers the whole body before decoding the JSON, this
+bounds the memory a single request can hold to the limit of its route.
+"""
+
+# Methods whose body the app reads; others are not limited
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class RequestBodyTooLarge(HTTPException):
+    """Raised while reading a request body that has grown past its limit."""
+
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Request body exceeds {limit} bytes",
+        )
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware enforcing a maximum request body size per route.
+
+    Args:
+        app: The ASGI app to wrap
+        default_limit (int): Limit in bytes for routes without their own
+        limits (Dict[Tuple[str, str], int], optional): Limits by (method, path)
+    """
+
+    def __init__(self, app, default_limit: int,
+                 limits: Optional[Dict[Tuple[str, str], int]] = None):
+        self.app = app
+        self.default_limit = default_limit
+        self.limits = limits or {}
+
+    def limit_for(self, method: str, path: str) -> int:
+        """
+        Return the body limit of a route.
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path
+
+        Returns:
+            int: Limit in bytes
+        """
+        return self.limits.get((method, path), self.default_limit)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in BODY_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limit_for(scope["method"], scope["path"])
+        error = RequestBodyTooLarge(limit)
+
+        content_length = _content_length(scope)
+        if content_length is not None and content_length > limit:
+            await _reject(error, scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def receive_wrapper():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise error
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except RequestBodyTooLarge:
+            # Normally rendered by the app's exception handlers; this covers
+            # bodies read outside of them
+            if response_started:
+                raise
+            await _reject(error, scope, receive, send)
+
+
+def _content_length(scope) -> Optional[int]:
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _reject(error: RequestBodyTooLarge, scope, receive, send) -> None:
+    # Close the connection rather than draining a body we won't read
+    response = JSONResponse(
+        {"detail": error.detail}, status_code=error.status_code, headers={"Connection": "close"}
+    )
+    await response(scope, receive, send)
@@ -1,49 +1,290 @@
+import asyncio
+import logging
+import time
 from functools import wraps
-from typing import Dict, List, Any, Callable
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import BackgroundTasks, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache_engine import CacheBackend, CacheEngine
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
 
 """
 This module provides caching functionality for the application.
 """
 
-# Simple in-memory cache implementation
-# Source: https://medium.com/becoming-a-better-software-developer/implementing-a-custom-cache-in-python-68c39ece8a8
-cache: Dict[str, Dict[str, Any]] = {}
+logger = logging.getLogger(__name__)
+
+# Per-request objects that must never become part of a cache key
+_UNKEYED_TYPES = (Session, AsyncSession, Request, Response, BackgroundTasks)
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Create the cache backend selected by ``settings.CACHE_BACKEND``.
+
+    ``memory`` keeps entries in the current process. ``socket`` shares one cache
+    between all worker processes through the server in ``app.core.shared_cache``.
+
+    Returns:
+        CacheBackend: The configured cache backend
+
+    Raises:
+        ValueError: If the configured backend name is unknown
+    """
+    if settings.CACHE_BACKEND == "memory":
+        return CacheEngine(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            sweep_interval=settings.CACHE_SWEEP_INTERVAL_SECONDS,
+        )
+
+    if settings.CACHE_BACKEND == "socket":
+        from app.core.shared_cache import SocketCacheBackend
+        return SocketCacheBackend(settings.CACHE_SOCKET_ADDRESS)
+
+    raise ValueError(f"Unknown cache backend: {settings.CACHE_BACKEND}")
+
+
+cache = create_cache_backend()
+
+async def _wait_for_entry(key: str, namespace: str, timeout: float) -> Tuple[bool, Any, bool]:
+    """
+    Poll the cache until another caller fills an entry or releases its lock.
+
+    The holder may release the lock without storing anything, e.g. when its
+    computation raised or its result was refused, so waiters take the lock
+    over as soon as it is free instead of waiting for the timeout.
+
+    Args:
+        key (str): Cache key being recomputed elsewhere
+        namespace (str): Namespace of the entry
+        timeout (float): Maximum seconds to wait
+
+    Returns:
+        Tuple[bool, Any, bool]: (True, value, False) once the entry appears,
+        (False, None, True) if the caller took over the lock, and
+        (False, None, False) on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.CACHE_LOCK_POLL_SECONDS)
+        hit, value = await cache.aget(key, namespace, record_stats=False)
+        if hit:
+            return True, value, False
+        if await cache.aacquire_lock(key, timeout):
+            # The holder may have stored the entry just before releasing the lock
+            hit, value = await cache.aget(key, namespace, record_stats=False)
+            if hit:
+                await cache.arelease_lock(key)
+                return True, value, False
+            return False, None, True
+    return False, None, False
+
+
+class _FlightAborted(Exception):
+    """Raised to callers waiting on a computation whose owner was cancelled."""
+
+
+# Computations currently running in this process, by cache key
+_inflight: Dict[str, "asyncio.Future"] = {}
+_refresh_tasks: Set["asyncio.Task"] = set()
+
+
+async def _single_flight(key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run a computation once per key, sharing its result with concurrent callers.
+
+    Args:
+        key (str): Cache key identifying the computation
+        compute (Callable): Returns the awaitable that produces the result
+
+    Returns:
+        Any: The computed result
+    """
+    future = _inflight.get(key)
+    if future is not None:
+        try:
+            return await asyncio.shield(future)
+        except _FlightAborted:
+            return await _single_flight(key, compute)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await compute()
+    except asyncio.CancelledError:
+        future.set_exception(_FlightAborted())
+        future.exception()  # waiters retry; don't log it as unretrieved
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+
+def _start_refresh(key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Refresh a stale entry in the background.
+
+    Args:
+        key (str): Cache key of the stale entry
+        compute (Callable): Returns the awaitable that recomputes and stores it
+    """
+    task = asyncio.create_task(_single_flight(key, compute))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_done)
+
+
+def _refresh_done(task: "asyncio.Task") -> None:
+    _refresh_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background cache refresh failed", exc_info=task.exception())
+
+
+def user_tag(user_id: int) -> str:
+    """
+    Return the cache tag for data owned by a user.
+
+    Args:
+        user_id (int): ID of the user
+
+    Returns:
+        str: Cache tag
+    """
+    return f"user:{user_id}"
+
+
+def default_key_builder(func: Callable, *args, **kwargs) -> str:
+    """
+    Build a cache key from a function's name and arguments.
+
+    Dependency-injected objects such as database sessions, requests and
+    background task queues change on every call, so they are left out of the key.
+
+    Args:
+        func (Callable): The cached function
+        *args: Positional arguments of the call
+        **kwargs: Keyword arguments of the call
+
+    Returns:
+        str: Cache key
+    """
+    key_parts = [func.__name__]
+    key_parts.extend([str(arg) for arg in args if not isinstance(arg, _UNKEYED_TYPES)])
+    key_parts.extend([
+        f"{k}:{v}" for k, v in sorted(kwargs.items())
+        if not isinstance(v, _UNKEYED_TYPES)
+    ])
+    return ":".join(key_parts)
 
-def timed_cache(seconds: int = 300):
+
+def timed_cache(
+    seconds: int = 300,
+    namespace: Optional[str] = None,
+    key_builder: Optional[Callable[..., str]] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    stale_seconds: int = 0
+):
     """
     Decorator to cache function results for a specified time period.
-    
+
+    Concurrent callers that miss on the same key share a single call of the
+    decorated function, both within this process and, through the backend's
+    recompute lock, across processes.
+
     Args:
         seconds (int): Cache expiration time in seconds
-        
+        namespace (str, optional): Namespace for cache statistics, defaults to
+            the decorated function's name
+        key_builder (Callable, optional): Called with the function's arguments
+            and returns the part of the cache key that identifies the result.
+            Defaults to a key built from the arguments that are not injected
+            dependencies.
+        tags (Callable, optional): Called with the function's arguments and
+            returns the tags to attach to the cached result, so it can be
+            dropped with ``cache.invalidate_tags`` when the underlying data changes
+        stale_seconds (int): How long an expired result may still be served
+            while it is refreshed in the background. The refresh reuses the
+            arguments of the call that noticed the stale entry, so only enable
+            this for functions whose arguments stay valid after that call returns.
+
     Returns:
         Callable: Decorated function with caching capability
     """
     def decorator(func: Callable):
+        cache_namespace = namespace or func.__name__
+
+        async def compute(cache_key: str, args: tuple, kwargs: dict) -> Any:
+            # Only one process recomputes a missing entry; the others wait for it
+            lock_timeout = settings.CACHE_LOCK_TIMEOUT_SECONDS
+            locked = await cache.aacquire_lock(cache_key, lock_timeout)
+            if not locked:
+                hit, cached_data, locked = await _wait_for_entry(cache_key, cache_namespace, lock_timeout)
+                if hit:
+                    return cached_data[1] if stale_seconds else cached_data
+
+            try:
+                # Read the tag generations first: if the data changes while the
+                # function runs, the result is stale and must not be cached
+                entry_tags = list(tags(*args, **kwargs)) if tags is not None else []
+                generations = await cache.atag_generations(entry_tags) if entry_tags else None
+
+                # Execute the function and cache the result, unless the generations
+                # could not be read (cache unreachable)
+                result = await func(*args, **kwargs)
+                if generations is None and entry_tags:
+                    return result
+                if stale_seconds:
+                    await cache.aset(
+                        cache_key,
+                        [time.time() + seconds, result],
+                        seconds + stale_seconds,
+                        cache_namespace,
+                        entry_tags,
+                        generations,
+                    )
+                else:
+                    await cache.aset(cache_key, result, seconds, cache_namespace, entry_tags, generations)
+            finally:
+                if locked:
+                    await cache.arelease_lock(cache_key)
+
+            return result
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Create a cache key from function name and arguments
-            key_parts = [func.__name__]
-            key_parts.extend([str(arg) for arg in args])
-            key_parts.extend([f"{k}:{v}" for k, v in kwargs.items()])
-            cache_key = ":".join(key_parts)
-            
+            if key_builder is not None:
+                cache_key = f"{cache_namespace}:{key_builder(*args, **kwargs)}"
+            else:
+                cache_key = default_key_builder(func, *args, **kwargs)
+
             # Check if the result is in cache and not expired
-            if cache_key in cache:
-                cached_data = cache[cache_key]
-                if datetime.now() < cached_data["expiry"]:
-                    return cached_data["data"]
-            
-            # Execute the function and cache the result
-            result = await func(*args, **kwargs)
-            cache[cache_key] = {
-                "data": result,
-                "expiry": datetime.now() + timedelta(seconds=seconds)
-            }
-            
-            return result
-        
+            hit, cached_data = await cache.aget(cache_key, cache_namespace)
+            if hit:
+                if not stale_seconds:
+                    record_cache_lookup(cache_namespace, "hit")
+                    return cached_data
+
+                fresh_until, result = cached_data
+                if time.time() >= fresh_until:
+                    record_cache_lookup(cache_namespace, "stale")
+                    if cache_key not in _inflight:
+                        _start_refresh(cache_key, lambda: compute(cache_key, args, kwargs))
+                else:
+                    record_cache_lookup(cache_namespace, "hit")
+                return result
+
+            record_cache_lookup(cache_namespace, "miss")
+            return await _single_flight(cache_key, lambda: compute(cache_key, args, kwargs))
+
         return wrapper
-    
-    return decorator
\ No newline at end of file
+
+    return decorator
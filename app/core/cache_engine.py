@@ -0,0 +1,620 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Set, Tuple
+
+"""
+This module provides the storage engines behind the response cache.
+"""
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Roughly estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value (Any): Value to measure
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    size = sys.getsizeof(value)
+
+    if _depth > 4 or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+        return size
+
+    if isinstance(value, dict):
+        return size + sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(_estimate_size(item, _depth + 1) for item in value)
+
+    # Pydantic models and plain objects keep their data in __dict__
+    if hasattr(value, "__dict__"):
+        return size + _estimate_size(vars(value), _depth + 1)
+
+    return size
+
+
+class CacheEntry:
+    """
+    A single cached value with its expiry and accounting data.
+
+    Attributes:
+        value (Any): The cached value
+        expiry (float): Monotonic timestamp after which the entry is stale
+        namespace (str): Namespace the entry is accounted under
+        size (int): Estimated size of the value in bytes
+        tags (Tuple[str, ...]): Tags the entry can be invalidated by
+    """
+    __slots__ = ("value", "expiry", "namespace", "size", "tags")
+
+    def __init__(
+        self,
+        value: Any,
+        expiry: float,
+        namespace: str,
+        size: int,
+        tags: Tuple[str, ...] = ()
+    ):
+        self.value = value
+        self.expiry = expiry
+        self.namespace = namespace
+        self.size = size
+        self.tags = tags
+
+
+class NamespaceStats:
+    """
+    Counters for a single cache namespace.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups not found or expired
+        evictions (int): Number of entries removed by LRU or size pressure
+        expirations (int): Number of entries removed because their TTL passed
+        invalidations (int): Number of entries removed through their tags
+        entries (int): Number of entries currently stored
+        bytes (int): Estimated bytes currently stored
+    """
+    __slots__ = (
+        "hits", "misses", "evictions", "expirations", "invalidations", "entries", "bytes"
+    )
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.entries = 0
+        self.bytes = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters and the hit rate as a plain dictionary."""
+        data: Dict[str, Any] = {name: getattr(self, name) for name in self.__slots__}
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+class CacheBackend:
+    """
+    Interface for the storage behind ``timed_cache``.
+
+    Backends store values under string keys with a TTL, track hit/miss
+    statistics per namespace, support tag invalidation, and provide a
+    short-lived per-key lock so only one caller recomputes a missing entry.
+
+    Every tag has a generation that invalidating it raises. A caller that
+    reads the generations before computing a value can pass them to ``set``,
+    which then refuses to store the value if one of its tags was invalidated
+    in the meantime, so a result computed from data that has since changed
+    is never cached.
+
+    Code running on the event loop uses the coroutine versions (``aget``,
+    ``aset`` and so on). They call the plain methods directly, which is fine
+    for backends that answer from memory; backends that wait on I/O override
+    them so a slow cache never blocks the loop.
+    """
+
+    def get(
+        self,
+        key: str,
+        namespace: str = "default",
+        record_stats: bool = True
+    ) -> Tuple[bool, Any]:
+        """
+        Look up a value in the cache.
+
+        Args:
+            key (str): Cache key
+            namespace (str): Namespace used for hit/miss accounting
+            record_stats (bool): Whether the lookup counts as a hit or miss
+
+        Returns:
+            Tuple[bool, Any]: (True, value) on a hit, (False, None) otherwise
+        """
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        namespace: str = "default",
+        tags: Iterable[str] = (),
+        generations: Optional[Sequence[int]] = None,
+        reliable: bool = False
+    ) -> bool:
+        """
+        Store a value in the cache.
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to store
+            ttl (float): Time to live in seconds
+            namespace (str): Namespace the entry is accounted under
+            tags (Iterable[str]): Tags the entry can later be invalidated by
+            generations (Sequence[int], optional): Generations of ``tags`` read
+                by ``tag_generations`` before the value was computed; the value
+                is not stored if any of them has changed since
+            reliable (bool): The write must not be lost, e.g. a marker that
+                keeps readers off stale data; remote backends retry it and
+                replay it later if the cache can't be reached
+
+        Returns:
+            bool: True if the value was stored, False otherwise
+        """
+        raise NotImplementedError
+
+    def tag_generations(self, tags: Iterable[str]) -> Optional[List[int]]:
+        """
+        Return the current generation of each tag.
+
+        Args:
+            tags (Iterable[str]): Tags to look up
+
+        Returns:
+            Optional[List[int]]: Generations in the order of ``tags``, or None
+            if they could not be read
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        """Remove a single entry, returning True if one was removed."""
+        raise NotImplementedError
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Remove every entry carrying any of the given tags.
+
+        Invalidations must not be lost: remote backends retry them and, if the
+        cache can't be reached, replay them once it is back and stay
+        ``degraded`` until then.
+
+        Args:
+            *tags (str): Tags to invalidate
+
+        Returns:
+            int: Number of entries removed
+        """
+        raise NotImplementedError
+
+    def degraded(self) -> bool:
+        """
+        Tell whether the cache is currently unreliable.
+
+        While degraded, lookups miss and writes that must not be lost may not
+        have reached the cache yet, so callers relying on them (such as the
+        read-your-writes pins) should assume the worst.
+
+        Returns:
+            bool: True if the cache can't currently be trusted
+        """
+        return False
+
+    def clear(self) -> None:
+        """Remove every entry and reset all statistics."""
+        raise NotImplementedError
+
+    def stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Return cache statistics, optionally for a single namespace."""
+        raise NotImplementedError
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        """
+        Try to take the recompute lock for a key.
+
+        Args:
+            key (str): Cache key being recomputed
+            ttl (float): Seconds after which the lock is released automatically
+
+        Returns:
+            bool: True if the caller now holds the lock, False if another does
+        """
+        raise NotImplementedError
+
+    def release_lock(self, key: str) -> None:
+        """Release the recompute lock for a key."""
+        raise NotImplementedError
+
+    async def aget(
+        self,
+        key: str,
+        namespace: str = "default",
+        record_stats: bool = True
+    ) -> Tuple[bool, Any]:
+        """Coroutine version of ``get``."""
+        return self.get(key, namespace, record_stats)
+
+    async def aset(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        namespace: str = "default",
+        tags: Iterable[str] = (),
+        generations: Optional[Sequence[int]] = None,
+        reliable: bool = False
+    ) -> bool:
+        """Coroutine version of ``set``."""
+        return self.set(key, value, ttl, namespace, tags, generations, reliable)
+
+    async def atag_generations(self, tags: Iterable[str]) -> Optional[List[int]]:
+        """Coroutine version of ``tag_generations``."""
+        return self.tag_generations(tags)
+
+    async def ainvalidate_tags(self, *tags: str) -> int:
+        """Coroutine version of ``invalidate_tags``."""
+        return self.invalidate_tags(*tags)
+
+    async def aacquire_lock(self, key: str, ttl: float) -> bool:
+        """Coroutine version of ``acquire_lock``."""
+        return self.acquire_lock(key, ttl)
+
+    async def arelease_lock(self, key: str) -> None:
+        """Coroutine version of ``release_lock``."""
+        self.release_lock(key)
+
+
+class CacheEngine(CacheBackend):
+    """
+    Bounded in-memory cache with LRU eviction and TTL expiry.
+
+    The engine caps both the number of entries and their total estimated size.
+    Expired entries are dropped when they are looked up, and a full sweep runs
+    at most once per sweep interval from within ``set`` so the cost is amortized
+    over writes instead of needing a background thread. Entries can carry tags,
+    which lets writers drop every entry derived from the data they changed.
+
+    Tag generations are drawn from one counter shared by all tags. A tag's
+    generation is forgotten ``generation_ttl`` seconds after its last
+    invalidation; forgotten and never invalidated tags report the highest
+    generation forgotten so far. Generations therefore never go back, and a
+    caller still holding an old one is refused by ``set`` however long its
+    computation took, while memory only holds the recently invalidated tags.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60.0,
+        generation_ttl: float = 60.0
+    ):
+        """
+        Initialize the cache engine.
+
+        Args:
+            max_entries (int): Maximum number of entries kept in the cache
+            max_bytes (int): Maximum total estimated size of all entries in bytes
+            sweep_interval (float): Minimum seconds between full expiry sweeps
+            generation_ttl (float): Seconds a tag's generation is kept after it
+                was last invalidated
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.generation_ttl = generation_ttl
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._stats: Dict[str, NamespaceStats] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        # Tag -> (generation, monotonic time of the invalidation), oldest first
+        self._generations: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._last_generation = 0
+        self._forgotten_generation = 0
+        self._locks: Dict[str, float] = {}
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self._lock = threading.RLock()
+
+    def _namespace_stats(self, namespace: str) -> NamespaceStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = NamespaceStats()
+        return stats
+
+    def _remove(self, key: str, reason: Optional[str] = None) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+        stats = self._namespace_stats(entry.namespace)
+        stats.entries -= 1
+        stats.bytes -= entry.size
+        if reason == "expired":
+            stats.expirations += 1
+        elif reason == "evicted":
+            stats.evictions += 1
+        elif reason == "invalidated":
+            stats.invalidations += 1
+
+    def get(
+        self,
+        key: str,
+        namespace: str = "default",
+        record_stats: bool = True
+    ) -> Tuple[bool, Any]:
+        """
+        Look up a value in the cache.
+
+        Args:
+            key (str): Cache key
+            namespace (str): Namespace used for hit/miss accounting
+            record_stats (bool): Whether the lookup counts as a hit or miss
+
+        Returns:
+            Tuple[bool, Any]: (True, value) on a hit, (False, None) otherwise
+        """
+        with self._lock:
+            stats = self._namespace_stats(namespace)
+            entry = self._entries.get(key)
+
+            if entry is None or entry.expiry <= time.monotonic():
+                if entry is not None:
+                    self._remove(key, reason="expired")
+                if record_stats:
+                    stats.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            if record_stats:
+                stats.hits += 1
+            return True, entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        namespace: str = "default",
+        tags: Iterable[str] = (),
+        generations: Optional[Sequence[int]] = None,
+        reliable: bool = False
+    ) -> bool:
+        """
+        Store a value in the cache, evicting old entries if limits are exceeded.
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to store
+            ttl (float): Time to live in seconds
+            namespace (str): Namespace the entry is accounted under
+            tags (Iterable[str]): Tags the entry can later be invalidated by
+            generations (Sequence[int], optional): Generations of ``tags`` read
+                before the value was computed
+            reliable (bool): Ignored; writes to memory can't be lost
+
+        Returns:
+            bool: True if the value was stored, False if it is too large to cache
+            or one of its tags was invalidated after ``generations`` was read
+        """
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        now = time.monotonic()
+        entry_tags = tuple(tags)
+
+        with self._lock:
+            if generations is not None and list(generations) != self._tag_generations(entry_tags):
+                return False
+
+            if key in self._entries:
+                self._remove(key)
+
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+
+            while self._entries and (
+                len(self._entries) >= self.max_entries
+                or self._bytes + size > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key, reason="evicted")
+
+            self._entries[key] = CacheEntry(value, now + ttl, namespace, size, entry_tags)
+            self._bytes += size
+
+            for tag in entry_tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            stats = self._namespace_stats(namespace)
+            stats.entries += 1
+            stats.bytes += size
+
+        return True
+
+    def delete(self, key: str) -> bool:
+        """
+        Remove a single entry from the cache.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            bool: True if an entry was removed, False otherwise
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Remove every entry carrying any of the given tags.
+
+        Args:
+            *tags (str): Tags to invalidate
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        now = time.monotonic()
+        with self._lock:
+            self._forget_generations(now)
+            for tag in tags:
+                self._last_generation += 1
+                self._generations.pop(tag, None)
+                self._generations[tag] = (self._last_generation, now)
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key, reason="invalidated")
+                    removed += 1
+        return removed
+
+    def _forget_generations(self, now: float) -> None:
+        cutoff = now - self.generation_ttl
+        while self._generations:
+            tag, (generation, invalidated_at) = next(iter(self._generations.items()))
+            if invalidated_at > cutoff:
+                break
+            del self._generations[tag]
+            self._forgotten_generation = max(self._forgotten_generation, generation)
+
+    def _tag_generations(self, tags: Iterable[str]) -> List[int]:
+        generations = []
+        for tag in tags:
+            known = self._generations.get(tag)
+            generations.append(known[0] if known is not None else self._forgotten_generation)
+        return generations
+
+    def tag_generations(self, tags: Iterable[str]) -> Optional[List[int]]:
+        """
+        Return the current generation of each tag.
+
+        Only tags invalidated within ``generation_ttl`` have their own
+        generation; all others share the highest one forgotten so far.
+
+        Args:
+            tags (Iterable[str]): Tags to look up
+
+        Returns:
+            Optional[List[int]]: Generations in the order of ``tags``
+        """
+        with self._lock:
+            return self._tag_generations(tags)
+
+    def clear(self) -> None:
+        """Remove every entry and reset all statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self._tags.clear()
+            self._locks.clear()
+            self._bytes = 0
+            # Forgetting every generation at once still refuses values whose
+            # computation started before one of them was handed out
+            self._generations.clear()
+            self._forgotten_generation = self._last_generation
+
+    def _sweep(self, now: float) -> int:
+        expired = [key for key, entry in self._entries.items() if entry.expiry <= now]
+        for key in expired:
+            self._remove(key, reason="expired")
+        self._forget_generations(now)
+        self._last_sweep = now
+        return len(expired)
+
+    def sweep(self) -> int:
+        """
+        Remove all expired entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        """
+        Try to take the recompute lock for a key.
+
+        Args:
+            key (str): Cache key being recomputed
+            ttl (float): Seconds after which the lock is released automatically
+
+        Returns:
+            bool: True if the caller now holds the lock, False if another does
+        """
+        now = time.monotonic()
+        with self._lock:
+            expiry = self._locks.get(key)
+            if expiry is not None and expiry > now:
+                return False
+            self._locks[key] = now + ttl
+            return True
+
+    def release_lock(self, key: str) -> None:
+        """
+        Release the recompute lock for a key.
+
+        Args:
+            key (str): Cache key being recomputed
+        """
+        with self._lock:
+            self._locks.pop(key, None)
+
+    def stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Args:
+            namespace (str, optional): Return only the counters for this namespace
+
+        Returns:
+            Dict: Counters per namespace together with global totals, or the
+            counters of a single namespace when one is given
+        """
+        with self._lock:
+            if namespace is not None:
+                return self._namespace_stats(namespace).as_dict()
+
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "tag_generations": len(self._generations),
+                "namespaces": {
+                    name: stats.as_dict() for name, stats in self._stats.items()
+                },
+            }
@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+import hashlib
+from functools import lru_cache
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup, track
+from app.core.serialization import JSON_MEDIA_TYPE
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+"""
+This module compresses response bodies according to the client's Accept-Encoding.
+
+Compressing a large page costs far more than sending it from the cache, so the
+compressed variants of cached bodies are cached as well. They are keyed by a
+digest of the body rather than by the request: a variant can never be served
+for a body it wasn't made from, and it doesn't need invalidating when the
+body's own cache entry is dropped, it simply stops being looked up.
+"""
+
+# Cache namespace of the compressed variants of cached bodies
+VARIANT_NAMESPACE = "compressed_responses"
+
+# Preferred encoding first, for clients that accept several equally
+_PREFERENCE = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Choose a content encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): Header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        Optional[str]: "br" or "gzip", or None to send the body uncompressed
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in _PREFERENCE:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body.
+
+    Args:
+        body (bytes): The body
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        bytes: The compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+async def acompress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body without holding up the event loop for long.
+
+    Bodies of at least ``RESPONSE_COMPRESSION_THREAD_MIN_BYTES`` are compressed
+    in a worker thread; zlib and brotli release the GIL while they work, so
+    other requests keep being served meanwhile. Smaller bodies take less time
+    to compress than the hand-off would, and are compressed inline.
+
+    Args:
+        body (bytes): The body
+        encoding (str): "br" or "gzip"
+
+    Returns:
+        bytes: The compressed body
+    """
+    if len(body) >= settings.RESPONSE_COMPRESSION_THREAD_MIN_BYTES:
+        return await asyncio.to_thread(compress, body, encoding)
+    return compress(body, encoding)
+
+
+async def _cached_variant(body: bytes, encoding: str) -> bytes:
+    key = f"{VARIANT_NAMESPACE}:{encoding}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+    hit, variant = await cache.aget(key, VARIANT_NAMESPACE)
+    record_cache_lookup(VARIANT_NAMESPACE, "hit" if hit else "miss")
+    if not hit:
+        variant = await acompress(body, encoding)
+        await cache.aset(key, variant, settings.RESPONSE_COMPRESSION_CACHE_SECONDS, VARIANT_NAMESPACE)
+    return variant
+
+
+async def compressed_response(request: Request, body: bytes, media_type: str = JSON_MEDIA_TYPE,
+                        cached: bool = False) -> Response:
+    """
+    Build a response, compressed if the client accepts it and the body is large enough.
+
+    Args:
+        request (Request): Incoming request
+        body (bytes): Encoded response body
+        media_type (str): Content type of the body
+        cached (bool): The body comes from the response cache, so its compressed
+            variant is worth caching too
+
+    Returns:
+        Response: The response, with ``Content-Encoding`` set when compressed
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is None or len(body) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return Response(body, media_type=media_type, headers=headers)
+
+    with track("compression"):
+        content = await _cached_variant(body, encoding) if cached else await acompress(body, encoding)
+    headers["Content-Encoding"] = encoding
+    return Response(content, media_type=media_type, headers=headers)
@@ -1,6 +1,7 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings  # Changed from pydantic.BaseSettings
 import os
+from typing import List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,20 +16,130 @@ class Settings(BaseSettings):
         DB_PASSWORD (str): Database password
         DB_HOST (str): Database host address
         DB_NAME (str): Database name
+        DATABASE_URL (Optional[str]): Full async database URL, overrides the DB_* parts
+            (e.g. "sqlite+aiosqlite:///./social.db" for local testing)
+        DB_POOL_SIZE (int): Number of connections kept open in the pool
+        DB_MAX_OVERFLOW (int): Extra connections allowed above the pool size under load
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection before failing
+        DB_POOL_RECYCLE (int): Seconds after which a connection is replaced; keep below
+            MySQL's wait_timeout
+        DB_POOL_PRE_PING (bool): Test connections on checkout and replace dead ones
+        DATABASE_REPLICA_URLS (List[str]): Async URLs of read replicas, as a JSON list;
+            empty to send all queries to the primary
+        DB_REPLICA_STRATEGY (str): How reads are spread over replicas, "round_robin"
+            or "least_connections"
+        DB_READ_YOUR_WRITES_SECONDS (float): How long a user's reads stay on the
+            primary after they changed data; should exceed the replication lag
+        DB_CREATE_SCHEMA_ON_STARTUP (bool): Create missing tables when the app starts
+            instead of with ``python -m app.db.bootstrap``
         SECRET_KEY (str): Secret key for token generation and validation
         ALGORITHM (str): Algorithm used for JWT encoding/decoding
         ACCESS_TOKEN_EXPIRE_MINUTES (int): Token expiration time in minutes
+        AUTH_STATELESS (bool): Trust the claims of a valid token on post endpoints
+            instead of loading the user; tokens of deleted users then keep working
+            there until they expire
+        AUTH_TOKEN_CACHE_SECONDS (int): Longest time a verified token stays cached; bounds
+            how long a deleted user's token may keep working where the deletion wasn't seen
+        HASH_WORKERS (int): Number of processes used for password hashing
+        HASH_MAX_PENDING (int): Hashing jobs allowed to run or wait before new ones
+            are rejected with 503
+        HASH_RETRY_AFTER_SECONDS (int): Retry-After value sent when hashing is saturated
+        BCRYPT_ROUNDS (Optional[int]): Fixed bcrypt cost for new password hashes
+        BCRYPT_TARGET_MS (Optional[float]): Calibrate the bcrypt cost at startup so one
+            hash takes about this long; ignored when BCRYPT_ROUNDS is set
+        CACHE_MAX_ENTRIES (int): Maximum number of entries held by the response cache
+        CACHE_MAX_BYTES (int): Maximum estimated size of the response cache in bytes
+        CACHE_SWEEP_INTERVAL_SECONDS (float): Minimum seconds between expiry sweeps
+        CACHE_BACKEND (str): Cache backend, "memory" (per process) or "socket" (shared)
+        CACHE_SOCKET_ADDRESS (str): Unix socket path or host:port of the shared cache server
+        CACHE_AUTH_TOKEN (Optional[str]): Shared secret cache clients send to the cache
+            server; required when it listens on a TCP address other than loopback
+        CACHE_RETRY_SECONDS (float): How long workers stop contacting an unreachable shared
+            cache server before trying again
+        CACHE_LOCK_TIMEOUT_SECONDS (float): Maximum time one caller may hold a recompute lock
+        CACHE_LOCK_POLL_SECONDS (float): Interval at which waiting callers re-check the cache
+        POSTS_PAGE_SIZE (int): Default number of posts per page
+        POSTS_MAX_PAGE_SIZE (int): Largest page size a client may request
+        POSTS_STREAM_BATCH_SIZE (int): Rows fetched per round-trip when streaming posts
+        POSTS_MAX_PREVIEW_CHARS (int): Longest text preview a post summary may include
+        POSTS_BATCH_MAX_ITEMS (int): Most posts accepted by one batch create request
+        POSTS_BATCH_MAX_BYTES (int): Largest total UTF-8 size of the texts in one batch
+        POST_MAX_BYTES (int): Largest UTF-8 size of one post's text
+        POST_COMPRESSION_ENABLED (bool): Store new post texts compressed
+        POST_COMPRESSION_MIN_BYTES (int): Shortest post text, in UTF-8 bytes, that is compressed
+        POST_COMPRESSION_LEVEL (int): zlib compression level, 1 (fastest) to 9 (smallest)
+        RESPONSE_COMPRESSION_MIN_BYTES (int): Smallest response body that is compressed
+        RESPONSE_GZIP_LEVEL (int): gzip level of compressed responses, 1 to 9
+        RESPONSE_BROTLI_QUALITY (int): Brotli quality of compressed responses, 0 to 11
+        RESPONSE_COMPRESSION_CACHE_SECONDS (int): How long compressed variants of
+            cached responses are kept
+        RESPONSE_COMPRESSION_THREAD_MIN_BYTES (int): Smallest response body that is
+            compressed in a worker thread instead of on the event loop
+        REQUEST_BODY_MAX_BYTES (int): Largest request body accepted by routes without
+            a limit of their own
+        POST_BODY_MAX_BYTES (int): Largest request body accepted by POST /posts
+        POSTS_BATCH_MAX_BODY_BYTES (int): Largest request body accepted by POST /posts/batch
     """
     APP_NAME: str = "SocialAPI"
     DB_USER: str = os.getenv("DB_USER", "root")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "password")
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_NAME: str = os.getenv("DB_NAME", "social_api")
+    DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_STRATEGY: str = "round_robin"
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_CREATE_SCHEMA_ON_STARTUP: bool = False
     
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+    AUTH_STATELESS: bool = False
+    AUTH_TOKEN_CACHE_SECONDS: int = 60
+
+    HASH_WORKERS: int = 2
+    HASH_MAX_PENDING: int = 64
+    HASH_RETRY_AFTER_SECONDS: int = 1
+    BCRYPT_ROUNDS: Optional[int] = None
+    BCRYPT_TARGET_MS: Optional[float] = None
+
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MB
+    CACHE_SWEEP_INTERVAL_SECONDS: float = 60.0
+    CACHE_BACKEND: str = "memory"
+    CACHE_SOCKET_ADDRESS: str = "/tmp/socialapi-cache.sock"
+    CACHE_AUTH_TOKEN: Optional[str] = None
+    CACHE_RETRY_SECONDS: float = 5.0
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 10.0
+    CACHE_LOCK_POLL_SECONDS: float = 0.05
+
+    POSTS_PAGE_SIZE: int = 50
+    POSTS_MAX_PAGE_SIZE: int = 200
+    POSTS_STREAM_BATCH_SIZE: int = 500
+    POSTS_MAX_PREVIEW_CHARS: int = 1000
+    POSTS_BATCH_MAX_ITEMS: int = 1000
+    POSTS_BATCH_MAX_BYTES: int = 8 * 1024 * 1024  # 8 MB
+    POST_MAX_BYTES: int = 1024 * 1024  # 1 MB
+    POST_COMPRESSION_ENABLED: bool = False
+    POST_COMPRESSION_MIN_BYTES: int = 1024
+    POST_COMPRESSION_LEVEL: int = 6
+
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 5
+    RESPONSE_COMPRESSION_CACHE_SECONDS: int = 300
+    RESPONSE_COMPRESSION_THREAD_MIN_BYTES: int = 65536
+
+    # Body limits leave room for the JSON around the text and for escaping
+    REQUEST_BODY_MAX_BYTES: int = 64 * 1024  # 64 KB
+    POST_BODY_MAX_BYTES: int = 2 * 1024 * 1024  # 2 MB
+    POSTS_BATCH_MAX_BODY_BYTES: int = 16 * 1024 * 1024  # 16 MB
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,212 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.security import (
+    calibrate_bcrypt_rounds,
+    configure_password_hashing,
+    get_password_hash,
+    verify_password,
+)
+
+"""
+This module runs password hashing in a dedicated process pool.
+
+bcrypt is deliberately slow and CPU-bound. Running it in worker processes keeps
+it off the event loop and the request threadpool, and lets it use more than one
+core despite the GIL. The number of outstanding hashing jobs is bounded, so a
+login storm is turned away with an error instead of starving other endpoints.
+If a worker process dies, the jobs it took down fail and the pool is replaced
+on the next job.
+"""
+
+class HashingUnavailable(Exception):
+    """Raised when a hashing job cannot be run at the moment."""
+
+
+class HashingQueueFull(HashingUnavailable):
+    """Raised when too many hashing jobs are already waiting."""
+
+
+class HashingPoolBroken(HashingUnavailable):
+    """Raised when a worker process died before finishing the job."""
+
+
+def resolve_bcrypt_rounds() -> Optional[int]:
+    """
+    Determine the bcrypt cost from the settings.
+    
+    Returns:
+        Optional[int]: ``BCRYPT_ROUNDS`` if set, otherwise a cost calibrated to
+        ``BCRYPT_TARGET_MS`` if set, otherwise None to keep passlib's default
+    """
+    if settings.BCRYPT_ROUNDS is not None:
+        return settings.BCRYPT_ROUNDS
+    if settings.BCRYPT_TARGET_MS is not None:
+        return calibrate_bcrypt_rounds(settings.BCRYPT_TARGET_MS)
+    return None
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for bcrypt hashing and verification.
+    """
+    
+    def __init__(self, workers: int, max_pending: int):
+        """
+        Initialize the hasher. Worker processes are started on first use.
+        
+        Args:
+            workers (int): Number of worker processes
+            max_pending (int): Maximum number of jobs running or queued at once;
+                further jobs are rejected with ``HashingQueueFull``
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._configured = False
+        self.rounds: Optional[int] = None
+        
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.restarts = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+    
+    def start(self) -> None:
+        """
+        Start the worker processes if they are not running yet.
+        
+        The bcrypt cost is resolved on the first start and applied both in this
+        process, where stale hashes are detected, and in every worker.
+        """
+        if self._executor is None:
+            if not self._configured:
+                self.rounds = resolve_bcrypt_rounds()
+                if self.rounds is not None:
+                    configure_password_hashing(self.rounds)
+                self._configured = True
+                
+            initializer, initargs = None, ()
+            if self.rounds is not None:
+                initializer, initargs = configure_password_hashing, (self.rounds,)
+                
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+    
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # Jobs failing together report the same broken pool; replace it once
+        if self._executor is executor:
+            self._executor = None
+            self.restarts += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Only touched from the event loop thread, so no lock is needed
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HashingQueueFull("Password hashing queue is full")
+        
+        self.start()
+        executor = self._executor
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            self.failed += 1
+            self._discard(executor)
+            raise HashingPoolBroken("Password hashing worker died") from e
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            
+        elapsed = time.perf_counter() - start
+        self.completed += 1
+        self.latency_seconds_total += elapsed
+        self.latency_seconds_max = max(self.latency_seconds_max, elapsed)
+        return result
+    
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password in the worker pool.
+        
+        Args:
+            password (str): The plaintext password to hash
+            
+        Returns:
+            str: The hashed password
+            
+        Raises:
+            HashingQueueFull: If too many hashing jobs are already pending
+            HashingPoolBroken: If the worker running the job died
+        """
+        return await self._submit(get_password_hash, password)
+    
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Verify a password against a hash in the worker pool.
+        
+        Args:
+            password (str): The plaintext password to verify
+            hashed_password (str): The hashed password to compare against
+            
+        Returns:
+            bool: True if the password matches the hash, False otherwise
+            
+        Raises:
+            HashingQueueFull: If too many hashing jobs are already pending
+            HashingPoolBroken: If the worker running the job died
+        """
+        return await self._submit(verify_password, password, hashed_password)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hashing pool statistics.
+        
+        Returns:
+            Dict: Jobs running and queued, completed, rejected and failed counts,
+            pool restarts, and the latency of completed jobs including time spent queued
+        """
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": self.rounds,
+            "max_pending": self.max_pending,
+            "running": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "restarts": self.restarts,
+            "latency_seconds_total": round(self.latency_seconds_total, 6),
+            "latency_seconds_max": round(self.latency_seconds_max, 6),
+            "latency_seconds_avg": round(
+                self.latency_seconds_total / self.completed, 6
+            ) if self.completed else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.HASH_WORKERS,
+    max_pending=settings.HASH_MAX_PENDING,
+)
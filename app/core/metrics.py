@@ -0,0 +1,436 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.responses import ORJSONResponse
+
+"""
+This module collects request metrics and renders them in the Prometheus text
+exposition format.
+
+Metrics are kept in process memory with one lock per metric, and a histogram
+observation is a bisect plus two additions, so the instrumentation is cheap
+enough to leave on. Time spent inside a request is attributed to its parts
+(auth, database, serialization) through a per-request ``RequestMetrics``
+object held in a context variable.
+"""
+
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the per-request query count buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Base class of the metric types.
+
+    Attributes:
+        name (str): Metric name
+        help (str): Description shown in the exposition
+        labelnames (Tuple[str, ...]): Names of the labels every sample carries
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        """
+        Render the metric in the text exposition format.
+
+        Returns:
+            List[str]: Exposition lines
+        """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            *labels (str): Label values, in the order of ``labelnames``
+            amount (float): Amount to add
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increase the gauge.
+
+        Args:
+            *labels (str): Label values, in the order of ``labelnames``
+            amount (float): Amount to add
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """
+        Decrease the gauge.
+
+        Args:
+            *labels (str): Label values, in the order of ``labelnames``
+            amount (float): Amount to subtract
+        """
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Set the gauge.
+
+        Args:
+            value (float): New value
+            *labels (str): Label values, in the order of ``labelnames``
+        """
+        with self._lock:
+            self._values[labels] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Counts observations into cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket incl. +Inf, sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): Observed value
+            *labels (str): Label values, in the order of ``labelnames``
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    A set of metrics rendered together.
+
+    Collectors are called right before rendering, so values that are cheap to
+    read on demand (pool occupancy, cache sizes) don't need updating per request.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric (_Metric): The metric
+
+        Returns:
+            _Metric: The same metric, for assignment
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        Register a function that updates gauges before each render.
+
+        Args:
+            collector (Callable): Called without arguments
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render all metrics in the text exposition format.
+
+        Returns:
+            str: The exposition
+        """
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to handle a request, including the response body",
+    ("method", "route", "status"),
+))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled", ("method",),
+))
+REQUEST_PHASE_DURATION = registry.register(Histogram(
+    "http_request_phase_seconds", "Time spent in each part of a request", ("method", "route", "phase"),
+))
+DB_QUERIES_PER_REQUEST = registry.register(Histogram(
+    "http_request_db_queries", "Database queries issued per request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+DB_QUERIES = registry.register(Counter(
+    "db_queries_total", "Database queries executed",
+))
+DB_QUERY_DURATION = registry.register(Histogram(
+    "db_query_duration_seconds", "Time spent executing a database query",
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total", "Response cache lookups by result", ("namespace", "result"),
+))
+
+
+class RequestMetrics:
+    """
+    Time spent in the parts of one request.
+
+    Attributes:
+        phases (Dict[str, float]): Seconds spent per phase (auth, db, serialization)
+        db_queries (int): Number of database queries issued
+        cache_hits (int): Response cache hits
+        cache_misses (int): Response cache misses
+    """
+    __slots__ = ("phases", "db_queries", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.db_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, phase: str, seconds: float) -> None:
+        """
+        Attribute time to a phase.
+
+        Args:
+            phase (str): Phase name
+            seconds (float): Time spent
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_request() -> Optional[RequestMetrics]:
+    """
+    Return the metrics of the request being handled, if any.
+
+    Returns:
+        Optional[RequestMetrics]: None outside a request
+    """
+    return _current.get()
+
+
+@contextmanager
+def track(phase: str) -> Iterator[None]:
+    """
+    Attribute the time spent in the block to a phase of the current request.
+
+    Args:
+        phase (str): Phase name, e.g. "auth" or "serialization"
+    """
+    request = _current.get()
+    if request is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request.add(phase, time.perf_counter() - start)
+
+
+def record_cache_lookup(namespace: str, result: str) -> None:
+    """
+    Count a response cache lookup.
+
+    Args:
+        namespace (str): Cache namespace
+        result (str): "hit", "stale" or "miss"
+    """
+    CACHE_REQUESTS.inc(namespace, result)
+    request = _current.get()
+    if request is not None:
+        if result == "miss":
+            request.cache_misses += 1
+        else:
+            request.cache_hits += 1
+
+
+def record_query(seconds: float) -> None:
+    """
+    Record a database query, for the process and for the current request.
+
+    Args:
+        seconds (float): Time the query took
+    """
+    DB_QUERIES.inc()
+    DB_QUERY_DURATION.observe(seconds)
+    request = _current.get()
+    if request is not None:
+        request.db_queries += 1
+        request.add("db", seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, in-flight requests and per-phase time.
+
+    Requests are labelled with their route template rather than the raw path,
+    so path parameters don't create new time series; unmatched paths share one
+    label. The in-flight gauge is labelled by method only, because the route
+    is not known until the request has been routed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_labels: Dict[object, str] = {}
+
+    def _route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+
+        label = self._route_labels.get(endpoint)
+        if label is None:
+            label = next(
+                (route.path for route in scope["app"].routes
+                 if getattr(route, "endpoint", None) is endpoint),
+                "unmatched",
+            )
+            self._route_labels[endpoint] = label
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        request = RequestMetrics()
+        token = _current.set(request)
+        status = "500"
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec(method)
+            _current.reset(token)
+
+            route = self._route_label(scope)
+            REQUEST_DURATION.observe(elapsed, method, route, status)
+            for phase, seconds in request.phases.items():
+                REQUEST_PHASE_DURATION.observe(seconds, method, route, phase)
+            DB_QUERIES_PER_REQUEST.observe(request.db_queries, method, route)
+
+
+class TimedJSONResponse(ORJSONResponse):
+    """orjson response whose rendering is attributed to the serialization phase."""
+
+    def render(self, content) -> bytes:
+        with track("serialization"):
+            return super().render(content)
@@ -0,0 +1,46 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+"""
+This module provides helpers for keyset (cursor) pagination.
+
+Cursors are opaque to clients: they encode the sort key of the last item on a
+page, ``(created_at, id)``, so the next page can continue with an index range
+scan instead of an OFFSET.
+"""
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """
+    Encode the sort key of the last item on a page into an opaque cursor.
+
+    Args:
+        created_at (datetime): Creation time of the last item
+        item_id (int): ID of the last item
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): Cursor string from the client
+
+    Returns:
+        Tuple[datetime, int]: Creation time and ID of the last item seen
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
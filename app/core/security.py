@@ -1,15 +1,91 @@
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
 """
 This module handles security-related functionality including password hashing,
 token generation, and validation.
+
+passlib and jose are imported on first use rather than at import time, which
+keeps them off the worker start-up path.
 """
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class InvalidTokenError(ValueError):
+    """Raised when an access token is malformed, has a bad signature or has expired."""
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """
+    Return the password hashing context, creating it on first use.
+    
+    Returns:
+        CryptContext: The bcrypt context shared by this process
+    """
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def configure_password_hashing(rounds: int) -> None:
+    """
+    Set the bcrypt work factor for new hashes.
+    
+    Hashes made with fewer rounds are reported by ``password_needs_update`` so
+    they can be upgraded when the user next logs in.
+    
+    Args:
+        rounds (int): bcrypt cost factor (log2 of the number of iterations)
+    """
+    get_pwd_context().update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """
+    Find the bcrypt cost that takes about ``target_ms`` on this host.
+    
+    One hash is timed at ``min_rounds``; each extra round doubles the work, so
+    the largest cost whose estimated time stays within the target is chosen.
+    
+    Args:
+        target_ms (float): Desired time for one hash in milliseconds
+        min_rounds (int): Lowest cost that may be returned
+        max_rounds (int): Highest cost that may be returned
+        
+    Returns:
+        int: The calibrated bcrypt cost
+    """
+    from passlib.context import CryptContext
+    
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=min_rounds)
+    
+    start = time.perf_counter()
+    context.hash("calibration-password")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+        
+    return rounds
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash should be replaced with one at the current cost.
+    
+    Args:
+        hashed_password (str): The stored password hash
+        
+    Returns:
+        bool: True if the hash uses outdated settings
+    """
+    return get_pwd_context().needs_update(hashed_password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -22,7 +98,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if the password matches the hash, False otherwise
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -35,7 +111,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         str: The hashed password
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -49,6 +125,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     Returns:
         str: Encoded JWT token
     """
+    from jose import jwt
+    
     to_encode = data.copy()
     
     if expires_delta:
@@ -73,6 +151,11 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         Dict: The decoded token payload
         
     Raises:
-        JWTError: If the token is invalid or expired
+        InvalidTokenError: If the token is invalid or expired
     """
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    from jose import JWTError, jwt
+    
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise InvalidTokenError(str(e)) from e
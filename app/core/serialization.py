@@ -0,0 +1,91 @@
+from typing import Any, Iterable, Optional
+
+import orjson
+
+"""
+This module turns database rows into JSON bytes in a single pass.
+
+Rows read from our own database are already valid, so listing endpoints skip
+pydantic on the way out: rows are mapped straight to plain dicts and encoded
+with orjson, which also handles datetimes natively. The resulting bytes are
+what gets cached and sent.
+"""
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact JSON.
+
+    Args:
+        value (Any): Dicts, lists, strings, numbers, None and datetimes
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    return orjson.dumps(value)
+
+
+def encode_post_page(posts: Iterable[Any], next_cursor: Optional[str]) -> bytes:
+    """
+    Encode a page of posts in the shape of ``PostPage``.
+
+    Args:
+        posts (Iterable): Post objects or rows with ``id``, ``user_id``, ``text``
+            and ``created_at``
+        next_cursor (str, optional): Cursor for the next page
+
+    Returns:
+        bytes: The page as JSON
+    """
+    return orjson.dumps({
+        "items": [
+            {"text": post.text, "id": post.id, "user_id": post.user_id, "created_at": post.created_at}
+            for post in posts
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+def encode_post_summary_page(rows: Iterable[Any], next_cursor: Optional[str]) -> bytes:
+    """
+    Encode a page of post summaries in the shape of ``PostSummaryPage``.
+
+    Args:
+        rows (Iterable): Rows with ``id``, ``user_id``, ``created_at`` and
+            optionally ``preview``
+        next_cursor (str, optional): Cursor for the next page
+
+    Returns:
+        bytes: The page as JSON
+    """
+    return orjson.dumps({
+        "items": [
+            {
+                "id": row.id,
+                "user_id": row.user_id,
+                "created_at": row.created_at,
+                "preview": getattr(row, "preview", None),
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+def encode_post_line(row: Any) -> bytes:
+    """
+    Encode one post as a line of newline-delimited JSON.
+
+    Args:
+        row (Any): Row with ``id``, ``user_id``, ``text`` and ``created_at``
+
+    Returns:
+        bytes: The post as JSON followed by a newline
+    """
+    return orjson.dumps(
+        {"id": row.id, "user_id": row.user_id, "text": row.text, "created_at": row.created_at},
+        option=orjson.OPT_APPEND_NEWLINE,
+    )
+
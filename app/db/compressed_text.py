@@ -0,0 +1,268 @@
+import base64
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+from app.core.text import utf8_size
+from app.core.config import settings
+
+"""
+This module stores long text columns compressed.
+
+A compressed value is kept in the same text column as plain ones, as a
+marker followed by the base64 encoded zlib stream, so compressed and plain
+rows can live side by side and no schema change is needed:
+
+    "\\x1fzlib:" + base64(zlib(utf8(text)))
+
+Base64 makes the compressed bytes a third larger, which is the price of
+keeping the existing TEXT column: a binary column would need a migration of
+every row and a second column or type for the plain ones. With the 3 to 5x
+zlib ratios typical of prose, a compressed post takes about 27 to 44% of its
+original size instead of 20 to 33%.
+
+Values are compressed when they are written, if ``POST_COMPRESSION_ENABLED``
+is set, they are at least ``POST_COMPRESSION_MIN_BYTES`` long and the result
+is actually smaller. Reads always recognise the marker, so turning compression
+off again doesn't need a rewrite. Plain text that happens to start with the
+marker is always stored compressed, which keeps the format unambiguous.
+"""
+
+# Prefix of compressed values; the codec name leaves room for others
+COMPRESSED_MARKER = "\x1fzlib:"
+
+# Base64 characters decoded at a time when only a prefix is needed
+_PREFIX_CHUNK_CHARS = 4096
+
+
+class CodecStats:
+    """
+    Counters describing the work done by the text codec.
+
+    Attributes:
+        compressed (int): Values stored compressed
+        skipped (int): Values stored plain because they were short or didn't shrink
+        raw_bytes (int): UTF-8 size of the compressed values
+        stored_bytes (int): Stored size of the compressed values
+        compress_seconds (float): CPU time spent compressing, including attempts
+            that were skipped because they didn't shrink
+        decompressed (int): Values decompressed, fully or partially
+        decompress_seconds (float): CPU time spent decompressing
+    """
+
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.compress_seconds = 0.0
+        self.decompressed = 0
+        self.decompress_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_compress(self, seconds: float, raw_bytes: int, stored_bytes: Optional[int]) -> None:
+        """
+        Record a compression attempt.
+
+        Args:
+            seconds (float): Time spent compressing
+            raw_bytes (int): UTF-8 size of the value
+            stored_bytes (int, optional): Stored size, None if the value was kept plain
+        """
+        with self._lock:
+            self.compress_seconds += seconds
+            if stored_bytes is None:
+                self.skipped += 1
+            else:
+                self.compressed += 1
+                self.raw_bytes += raw_bytes
+                self.stored_bytes += stored_bytes
+
+    def record_skip(self) -> None:
+        """Record a value stored plain without attempting compression."""
+        with self._lock:
+            self.skipped += 1
+
+    def record_decompress(self, seconds: float) -> None:
+        """
+        Record a decompression.
+
+        Args:
+            seconds (float): Time spent decompressing
+        """
+        with self._lock:
+            self.decompressed += 1
+            self.decompress_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the counters along with the compression ratio.
+
+        Returns:
+            Dict: The counters, plus ``ratio`` (raw size over stored size of the
+            compressed values, 0.0 before any value was compressed)
+        """
+        with self._lock:
+            return {
+                "enabled": settings.POST_COMPRESSION_ENABLED,
+                "compressed": self.compressed,
+                "skipped": self.skipped,
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": self.stored_bytes,
+                "ratio": round(self.raw_bytes / self.stored_bytes, 3) if self.stored_bytes else 0.0,
+                "compress_seconds": round(self.compress_seconds, 6),
+                "decompressed": self.decompressed,
+                "decompress_seconds": round(self.decompress_seconds, 6),
+            }
+
+
+codec_stats = CodecStats()
+
+
+def is_compressed(value: str) -> bool:
+    """
+    Tell whether a stored value is in the compressed format.
+
+    Args:
+        value (str): Value as stored in the database
+
+    Returns:
+        bool: True if the value starts with the marker
+    """
+    return value.startswith(COMPRESSED_MARKER)
+
+
+def compress_text(text: str, force: bool = False) -> str:
+    """
+    Convert text to its stored form.
+
+    Args:
+        text (str): The text
+        force (bool): Compress even when compression is disabled, e.g. when
+            backfilling
+
+    Returns:
+        str: The compressed form, or ``text`` itself if it is kept plain
+    """
+    must_compress = is_compressed(text)
+    raw_bytes = utf8_size(text)
+    if not must_compress and (
+        not (settings.POST_COMPRESSION_ENABLED or force)
+        or raw_bytes < settings.POST_COMPRESSION_MIN_BYTES
+    ):
+        codec_stats.record_skip()
+        return text
+
+    start = time.perf_counter()
+    compressed = zlib.compress(text.encode("utf-8"), settings.POST_COMPRESSION_LEVEL)
+    stored = COMPRESSED_MARKER + base64.b64encode(compressed).decode("ascii")
+    elapsed = time.perf_counter() - start
+
+    if len(stored) >= raw_bytes and not must_compress:
+        codec_stats.record_compress(elapsed, raw_bytes, None)
+        return text
+
+    codec_stats.record_compress(elapsed, raw_bytes, len(stored))
+    return stored
+
+
+def decompress_text(value: str) -> str:
+    """
+    Convert a stored value back to its text.
+
+    Args:
+        value (str): Value as stored in the database
+
+    Returns:
+        str: The text
+    """
+    if not is_compressed(value):
+        return value
+
+    start = time.perf_counter()
+    text = zlib.decompress(base64.b64decode(value[len(COMPRESSED_MARKER):])).decode("utf-8")
+    codec_stats.record_decompress(time.perf_counter() - start)
+    return text
+
+
+def decompress_prefix(value: str, chars: int) -> str:
+    """
+    Return the first characters of a stored value's text.
+
+    Compressed values are only decompressed as far as needed.
+
+    Args:
+        value (str): Value, or a long enough prefix of it, as stored in the database
+        chars (int): Number of characters wanted
+
+    Returns:
+        str: Up to ``chars`` leading characters of the text
+    """
+    if not is_compressed(value):
+        return value[:chars]
+
+    start = time.perf_counter()
+    decompressor = zlib.decompressobj()
+    # A character is at most 4 bytes in UTF-8
+    wanted = chars * 4
+    output = b""
+    position = len(COMPRESSED_MARKER)
+    while len(output) < wanted and position < len(value) and not decompressor.eof:
+        end = position + _PREFIX_CHUNK_CHARS
+        # Base64 decodes in groups of 4 characters
+        chunk = value[position:end]
+        chunk = chunk[:len(chunk) - len(chunk) % 4]
+        if not chunk:
+            break
+        output += decompressor.decompress(base64.b64decode(chunk), wanted - len(output))
+        position += len(chunk)
+    codec_stats.record_decompress(time.perf_counter() - start)
+
+    # The cut may have split the last character
+    return output.decode("utf-8", "ignore")[:chars]
+
+
+def stored_prefix_length(chars: int) -> int:
+    """
+    Return how much of a compressed value is enough to decompress a prefix.
+
+    Args:
+        chars (int): Number of characters wanted
+
+    Returns:
+        int: Number of leading stored characters to fetch
+    """
+    # zlib adds at most 5 bytes per 16 KB block plus a small header to
+    # incompressible data; base64 takes 4 characters per 3 bytes
+    compressed_bytes = chars * 4 + (chars * 4 // 16384 + 1) * 5 + 16
+    return len(COMPRESSED_MARKER) + (compressed_bytes + 2) // 3 * 4
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text column whose values are stored compressed when that pays off.
+
+    Compression happens when a value is bound into an INSERT or UPDATE and
+    decompression when a row with the column selected is loaded; queries that
+    don't select the column never decompress anything. Comparisons bind their
+    values as plain text.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        return decompress_text(value)
+
+    def coerce_compared_value(self, op, value):
+        return Text()
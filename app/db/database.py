@@ -1,32 +1,80 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import time
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncIterator, List
 from app.core.config import settings
+from app.core.metrics import record_query
+from app.db.pool_metrics import InstrumentedAsyncQueuePool
+from app.db.routing import ROUTER_INFO_KEY, ReplicaRouter, RoutingSession
 
 """
 This module manages database connection and session handling.
 """
 
 # Create SQLAlchemy engine
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}/{settings.DB_NAME}"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL or (
+    f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}/{settings.DB_NAME}"
+)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is not None:
+        record_query(time.perf_counter() - start)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    async_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    # Query count and time, per process and per request (see app.core.metrics)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return async_engine
+
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
+
+# Read replicas, if configured; queries marked with on_replica are sent there.
+# The read-your-writes pins live in the cache, so every worker must see them
+if settings.DATABASE_REPLICA_URLS and settings.CACHE_BACKEND != "socket":
+    raise ValueError("DATABASE_REPLICA_URLS requires CACHE_BACKEND=socket")
+
+replica_engines: List[AsyncEngine] = [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+
+# Create session factory; objects stay usable after commit without a reload
+if replica_engines:
+    SessionLocal = async_sessionmaker(
+        engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        info={ROUTER_INFO_KEY: ReplicaRouter(replica_engines, settings.DB_REPLICA_STRATEGY)},
+    )
+else:
+    SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 # Function to get a database session
-def get_db():
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
     Dependency function to get a database session.
     
     Yields:
-        SQLAlchemy session: Database session to execute queries
+        AsyncSession: Database session to execute queries
         
     Notes:
         Session is closed automatically after request is complete
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
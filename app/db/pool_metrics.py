@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+"""
+This module provides connection pool instrumentation.
+
+SQLAlchemy's pool events fire only after a connection has been handed out, so
+they cannot tell how long a request waited for one. The instrumented pools
+time each checkout instead, which is what is needed to size the pool against
+the number of workers.
+"""
+
+class PoolMetrics:
+    """
+    Counters describing connection checkouts from a pool.
+    
+    Attributes:
+        checkouts (int): Number of successful checkouts
+        timeouts (int): Number of checkouts that gave up waiting for a connection
+        wait_seconds_total (float): Total time spent waiting in checkouts
+        wait_seconds_max (float): Longest single checkout wait
+        overflow_peak (int): Highest number of overflow connections seen
+    """
+    
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_peak = 0
+        self._lock = threading.Lock()
+    
+    def record_checkout(self, wait: float, overflow: int) -> None:
+        """
+        Record a successful checkout.
+        
+        Args:
+            wait (float): Seconds spent obtaining the connection
+            overflow (int): Overflow connections in use after the checkout
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.overflow_peak = max(self.overflow_peak, overflow)
+    
+    def record_timeout(self) -> None:
+        """Record a checkout that timed out."""
+        with self._lock:
+            self.timeouts += 1
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout wait time, timeouts and overflow usage.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, max(self.overflow(), 0))
+        return connection
+    
+    def recreate(self):
+        # Keep counters across pool recreation (e.g. after a disconnect)
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def pool_stats(pool: Any) -> Dict[str, Any]:
+    """
+    Summarize the occupancy and checkout metrics of a connection pool.
+    
+    Args:
+        pool (Pool): The engine's connection pool
+        
+    Returns:
+        Dict: Pool size, connections checked in and out, overflow in use and, for
+        instrumented pools, checkout counts and wait times
+    """
+    stats: Dict[str, Any] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "overflow_peak": metrics.overflow_peak,
+            "wait_seconds_total": round(metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(metrics.wait_seconds_max, 6),
+            "wait_seconds_avg": round(
+                metrics.wait_seconds_total / metrics.checkouts, 6
+            ) if metrics.checkouts else 0.0,
+        })
+    
+    return stats
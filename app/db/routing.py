@@ -0,0 +1,146 @@
+import itertools
+import threading
+from typing import List, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from app.core.cache import cache
+from app.core.config import settings
+
+"""
+This module routes read-only queries to database replicas.
+
+Repositories opt a query in with ``on_replica``; everything else, including
+flushes and any query issued after the session has used the primary, goes to
+the primary. Replicas lag behind the primary, so a user who has just written
+is pinned to the primary for ``DB_READ_YOUR_WRITES_SECONDS`` and sees their
+own changes straight away. Pins are kept in the cache, which therefore has to
+be the shared one whenever replicas are configured.
+"""
+
+# Execution option marking a statement as safe to run on a replica
+REPLICA_OPTION = "read_replica"
+
+# Session.info key holding the ReplicaRouter
+ROUTER_INFO_KEY = "replica_router"
+
+# Cache namespace of the read-your-writes pins
+PIN_NAMESPACE = "db_primary_pins"
+
+_Statement = TypeVar("_Statement", bound=Executable)
+
+
+class ReplicaRouter:
+    """
+    Picks the replica engine for each read.
+
+    Attributes:
+        engines (List[AsyncEngine]): Replica engines
+        strategy (str): "round_robin" or "least_connections"
+    """
+
+    def __init__(self, engines: List[AsyncEngine], strategy: str = "round_robin"):
+        """
+        Initialize the router.
+
+        Args:
+            engines (List[AsyncEngine]): Replica engines, at least one
+            strategy (str): "round_robin" cycles through the replicas,
+                "least_connections" picks the one with the fewest checked-out
+                connections
+
+        Raises:
+            ValueError: If no engines are given or the strategy is unknown
+        """
+        if not engines:
+            raise ValueError("At least one replica engine is required")
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+
+    def choose(self) -> AsyncEngine:
+        """
+        Return the replica to use for the next read.
+
+        Returns:
+            AsyncEngine: The selected replica engine
+        """
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda engine: engine.pool.checkedout())
+
+        with self._lock:
+            return next(self._cycle)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends statements marked with ``on_replica`` to a replica.
+
+    Once a session has used the primary it stays there, so reads within a
+    unit of work always see its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        router: Optional[ReplicaRouter] = self.info.get(ROUTER_INFO_KEY)
+
+        if (
+            router is not None
+            and not self._flushing
+            and not self.info.get("primary_used")
+            and clause is not None
+            and clause.get_execution_options().get(REPLICA_OPTION)
+        ):
+            return router.choose().sync_engine
+
+        self.info["primary_used"] = True
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def _pin_key(user_id: int) -> str:
+    return f"{PIN_NAMESPACE}:{user_id}"
+
+
+async def mark_primary_write(user_id: int) -> None:
+    """
+    Pin a user's reads to the primary after they changed data.
+
+    Args:
+        user_id (int): ID of the user whose data changed
+    """
+    if settings.DATABASE_REPLICA_URLS:
+        await cache.aset(
+            _pin_key(user_id), True, settings.DB_READ_YOUR_WRITES_SECONDS, PIN_NAMESPACE,
+            reliable=True,
+        )
+
+
+async def on_replica(statement: _Statement, user_id: Optional[int] = None) -> _Statement:
+    """
+    Mark a read-only statement as safe to run on a replica.
+
+    Args:
+        statement (Executable): The read-only statement
+        user_id (int, optional): User the data belongs to; if they wrote
+            recently the statement is left on the primary
+
+    Returns:
+        Executable: The statement, marked for a replica where appropriate
+    """
+    if not settings.DATABASE_REPLICA_URLS:
+        return statement
+
+    if user_id is not None:
+        # A pin may be waiting to reach an unreachable cache, so stay on the primary
+        if cache.degraded():
+            return statement
+        pinned, _ = await cache.aget(_pin_key(user_id), PIN_NAMESPACE, record_stats=False)
+        if pinned:
+            return statement
+
+    return statement.execution_options(**{REPLICA_OPTION: True})
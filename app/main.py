@@ -1,18 +1,53 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.models.models import Base
-from app.db.database import engine
-from app.routes import user, post
+from app.db.bootstrap import create_schema
+from app.db.database import engine, replica_engines
+from app.routes import user, post, metrics
+from app.core.body_limit import BodySizeLimitMiddleware
 from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.metrics import MetricsMiddleware, TimedJSONResponse
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start and stop the resources shared by all requests.
+    
+    The schema is normally created by ``python -m app.db.bootstrap`` before the
+    workers start; ``DB_CREATE_SCHEMA_ON_STARTUP`` does it here instead, which
+    is convenient for local development.
+    """
+    if settings.DB_CREATE_SCHEMA_ON_STARTUP:
+        await create_schema()
+    password_hasher.start()
+    
+    try:
+        yield
+    finally:
+        password_hasher.shutdown()
+        await engine.dispose()
+        for replica in replica_engines:
+            await replica.dispose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     description="A social media API with user authentication and post management",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
+)
+
+# Reject oversized request bodies before they are buffered and parsed
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    default_limit=settings.REQUEST_BODY_MAX_BYTES,
+    limits={
+        ("POST", "/posts"): settings.POST_BODY_MAX_BYTES,
+        ("POST", "/posts/batch"): settings.POSTS_BATCH_MAX_BODY_BYTES,
+    },
 )
 
 # Configure CORS
@@ -24,9 +59,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency and where the time inside each request goes
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(user.router)
 app.include_router(post.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
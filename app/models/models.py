@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from app.db.compressed_text import CompressedText
 
 Base = declarative_base()
 
@@ -15,6 +16,7 @@ class User(Base):
         email (str): Unique email address for the user
         password (str): Hashed password for authentication
         created_at (datetime): Timestamp when the user was created
+        posts_version (int): Incremented whenever the user's posts change
     """
     __tablename__ = "users"
     
@@ -22,6 +24,7 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     password = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=func.now())
+    posts_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationship with Post model
     posts = relationship("Post", back_populates="author", cascade="all, delete-orphan")
@@ -32,15 +35,19 @@ class Post(Base):
     
     Attributes:
         id (int): Primary key for the post
-        text (str): Content of the post
+        text (str): Content of the post, stored compressed when enabled
         user_id (int): Foreign key referencing the post's author
         created_at (datetime): Timestamp when the post was created
     """
     
     __tablename__ = "posts"
+    __table_args__ = (
+        # Serves keyset pagination of a user's posts as an index range scan
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    text = Column(Text, nullable=False)
+    text = Column(CompressedText, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=func.now())
     
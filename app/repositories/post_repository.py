@@ -1,22 +1,33 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from collections import namedtuple
+from sqlalchemy import Text, case, delete, func, insert, literal_column, select, tuple_, type_coerce, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 from app.models.models import Post, User
+from app.db.compressed_text import COMPRESSED_MARKER, decompress_prefix, stored_prefix_length
+from app.db.routing import mark_primary_write, on_replica
+
+PostSummaryRow = namedtuple("PostSummaryRow", ["id", "user_id", "created_at", "preview"])
+
+# Connection.info key caching whether MySQL gives multi-row inserts consecutive IDs
+CONSECUTIVE_IDS_INFO_KEY = "mysql_consecutive_insert_ids"
 
 class PostRepository:
     """
     Repository class for Post-related database operations.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
         Initialize the repository with a database session.
         
         Args:
-            db (Session): SQLAlchemy database session
+            db (AsyncSession): SQLAlchemy async database session
         """
         self.db = db
     
-    def create_post(self, text: str, user_id: int) -> Post:
+    async def create_post(self, text: str, user_id: int) -> Post:
         """
         Create a new post.
         
@@ -30,36 +41,229 @@ class PostRepository:
         post = Post(text=text, user_id=user_id)
         
         self.db.add(post)
-        self.db.commit()
-        self.db.refresh(post)
+        await self._bump_posts_version(user_id)
+        await self.db.commit()
+        await self.db.refresh(post)
+        await mark_primary_write(user_id)
         
         return post
     
-    def get_user_posts(self, user_id: int) -> List[Post]:
+    async def create_posts(self, texts: List[str], user_id: int) -> List[int]:
+        """
+        Create several posts in one statement and one transaction.
+        
+        The generated IDs are read back with ``RETURNING`` where the database
+        supports it. MySQL does not. There the IDs of a multi-row INSERT are
+        derived from the last insert ID, but only if the server is known to
+        allocate them consecutively (see ``_mysql_ids_are_consecutive``).
+        Otherwise, and on other databases without ``RETURNING``, the posts are
+        inserted row by row within the same transaction.
+        
+        Args:
+            texts (List[str]): Contents of the posts, in order
+            user_id (int): ID of the posts' author
+            
+        Returns:
+            List[int]: IDs of the created posts, in the order of ``texts``
+        """
+        rows = [{"text": text, "user_id": user_id} for text in texts]
+        connection = await self.db.connection()
+        
+        if connection.dialect.insert_returning:
+            result = await self.db.execute(
+                insert(Post).returning(Post.id, sort_by_parameter_order=True), rows
+            )
+            ids = list(result.scalars())
+        elif connection.dialect.name == "mysql" and await self._mysql_ids_are_consecutive(connection):
+            result = await self.db.execute(insert(Post).values(rows))
+            ids = list(range(result.lastrowid, result.lastrowid + len(rows)))
+        else:
+            # No reliable way to recover the IDs of a multi-row insert; still one transaction
+            ids = [
+                (await self.db.execute(insert(Post).values(row))).inserted_primary_key[0]
+                for row in rows
+            ]
+            
+        await self._bump_posts_version(user_id)
+        await self.db.commit()
+        await mark_primary_write(user_id)
+        
+        return ids
+    
+    async def _mysql_ids_are_consecutive(self, connection: AsyncConnection) -> bool:
+        """
+        Tell whether the rows of one multi-row INSERT get consecutive IDs.
+        
+        InnoDB only promises ``lastrowid``, ``lastrowid + 1``, ... with an
+        ``auto_increment_increment`` of 1 and an ``innodb_autoinc_lock_mode``
+        of 0 or 1, which reserve the IDs of the whole statement at once. Mode 2,
+        the MySQL 8 default, and larger increments, e.g. under multi-primary
+        Group Replication, don't. The answer is cached per connection.
+        
+        Args:
+            connection (AsyncConnection): Connection of the current transaction
+            
+        Returns:
+            bool: True if the IDs can be derived from the last insert ID
+        """
+        consecutive = connection.info.get(CONSECUTIVE_IDS_INFO_KEY)
+        if consecutive is None:
+            increment, lock_mode = (await connection.execute(select(
+                literal_column("@@auto_increment_increment"),
+                literal_column("@@innodb_autoinc_lock_mode"),
+            ))).one()
+            consecutive = int(increment) == 1 and int(lock_mode) <= 1
+            connection.info[CONSECUTIVE_IDS_INFO_KEY] = consecutive
+        return consecutive
+    
+    async def get_posts_version(self, user_id: int) -> int:
+        """
+        Retrieve the version of a user's posts.
+        
+        The version changes whenever the user creates or deletes posts, so it
+        tells whether anything derived from the posts is still current. It is
+        always read from the primary: a lagging replica would hand out an old
+        version, and with it validators for pages that have since changed.
+        
+        Args:
+            user_id (int): User ID to get the version for
+            
+        Returns:
+            int: The version, 0 if the user doesn't exist
+        """
+        result = await self.db.execute(select(User.posts_version).where(User.id == user_id))
+        return result.scalar() or 0
+    
+    async def _bump_posts_version(self, user_id: int) -> None:
+        """
+        Increment the version of a user's posts in the current transaction.
+        
+        Args:
+            user_id (int): ID of the user whose posts changed
+        """
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(posts_version=User.posts_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    
+    async def get_user_posts(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Post]:
         """
-        Retrieve all posts for a specific user.
+        Retrieve a page of posts for a specific user, newest first.
+        
+        Posts are ordered by ``(created_at, id)`` descending so that each page is
+        a range scan on the ``(user_id, created_at, id)`` index.
         
         Args:
             user_id (int): User ID to get posts for
+            limit (int): Maximum number of posts to return
+            after (Tuple[datetime, int], optional): Sort key of the last post on
+                the previous page; only older posts are returned
             
         Returns:
             List[Post]: List of Post objects
         """
-        return self.db.query(Post).filter(Post.user_id == user_id).all()
+        statement = select(Post).where(Post.user_id == user_id)
+        
+        if after is not None:
+            statement = statement.where(tuple_(Post.created_at, Post.id) < tuple_(*after))
+            
+        statement = statement.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+        
+        statement = await on_replica(statement, user_id)
+        result = await self.db.execute(statement)
+        return list(result.scalars().all())
     
-    def get_post_by_id(self, post_id: int) -> Optional[Post]:
+    async def get_user_post_summaries(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        preview_chars: int = 0
+    ) -> List[Row]:
         """
-        Retrieve a post by ID.
+        Retrieve a page of post summaries for a specific user, newest first.
+        
+        Only the requested columns are selected: the text column is skipped
+        entirely, or cut to a prefix in the database when a preview is requested,
+        so full post bodies are never sent over the wire. For compressed posts
+        the prefix is long enough to decompress the preview from.
         
         Args:
-            post_id (int): Post ID to search for
+            user_id (int): User ID to get posts for
+            limit (int): Maximum number of posts to return
+            after (Tuple[datetime, int], optional): Sort key of the last post on
+                the previous page; only older posts are returned
+            preview_chars (int): Number of leading text characters to include,
+                0 to leave the text out
             
         Returns:
-            Optional[Post]: Post object if found, None otherwise
+            List[Row]: Rows with ``id``, ``user_id``, ``created_at`` and ``preview``
         """
-        return self.db.query(Post).filter(Post.id == post_id).first()
+        columns = [Post.id, Post.user_id, Post.created_at]
+        if preview_chars:
+            # Bypass the column type; previews are decompressed below
+            stored = type_coerce(Post.text, Text)
+            columns.append(case(
+                (stored.startswith(COMPRESSED_MARKER),
+                 func.substr(stored, 1, stored_prefix_length(preview_chars))),
+                else_=func.substr(stored, 1, preview_chars),
+            ).label("preview"))
+        
+        statement = select(*columns).where(Post.user_id == user_id)
+        
+        if after is not None:
+            statement = statement.where(tuple_(Post.created_at, Post.id) < tuple_(*after))
+            
+        statement = statement.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit)
+        
+        statement = await on_replica(statement, user_id)
+        result = await self.db.execute(statement)
+        if not preview_chars:
+            return list(result.all())
+        
+        return [
+            PostSummaryRow(row.id, row.user_id, row.created_at, decompress_prefix(row.preview, preview_chars))
+            for row in result
+        ]
     
-    def delete_post(self, post_id: int, user_id: int) -> bool:
+    async def stream_user_posts(self, user_id: int, batch_size: int) -> AsyncIterator[Row]:
+        """
+        Stream every post of a user, newest first, with a server-side cursor.
+        
+        Rows are fetched from the database in batches and returned as plain rows
+        rather than ORM objects, so they are not kept in the session's identity
+        map and memory use stays flat regardless of how many posts there are.
+        
+        Args:
+            user_id (int): User ID to get posts for
+            batch_size (int): Number of rows fetched from the server at a time
+            
+        Yields:
+            Row: Rows with ``id``, ``user_id``, ``text`` and ``created_at``
+        """
+        statement = (
+            select(Post.id, Post.user_id, Post.text, Post.created_at)
+            .where(Post.user_id == user_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+        
+        statement = await on_replica(statement, user_id)
+        result = await self.db.stream(statement)
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+    
+    async def delete_post(self, post_id: int, user_id: int) -> bool:
         """
         Delete a post if it belongs to the specified user.
         
@@ -70,12 +274,62 @@ class PostRepository:
         Returns:
             bool: True if the post was deleted, False otherwise
         """
-        post = self.db.query(Post).filter(Post.id == post_id, Post.user_id == user_id).first()
+        result = await self.db.execute(
+            delete(Post)
+            .where(Post.id == post_id, Post.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.rowcount > 0
+        if deleted:
+            await self._bump_posts_version(user_id)
+        await self.db.commit()
         
-        if not post:
-            return False
+        if deleted:
+            await mark_primary_write(user_id)
+        return deleted
+    
+    async def delete_posts(self, post_ids: List[int], user_id: int) -> List[int]:
+        """
+        Delete those of the given posts that belong to the specified user.
+        
+        Where the database supports ``DELETE ... RETURNING`` this is a single
+        statement. Otherwise the matching IDs are locked with ``SELECT ... FOR
+        UPDATE`` and deleted in the same transaction.
+        
+        Args:
+            post_ids (List[int]): IDs of the posts to delete
+            user_id (int): ID of the user who owns the posts
             
-        self.db.delete(post)
-        self.db.commit()
+        Returns:
+            List[int]: IDs of the posts that were deleted
+        """
+        condition = (Post.id.in_(post_ids), Post.user_id == user_id)
+        connection = await self.db.connection()
+        
+        if connection.dialect.delete_returning:
+            result = await self.db.execute(
+                delete(Post)
+                .where(*condition)
+                .returning(Post.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted = list(result.scalars())
+        else:
+            result = await self.db.execute(
+                select(Post.id).where(*condition).with_for_update()
+            )
+            deleted = list(result.scalars())
+            if deleted:
+                await self.db.execute(
+                    delete(Post)
+                    .where(Post.id.in_(deleted))
+                    .execution_options(synchronize_session=False)
+                )
+                
+        if deleted:
+            await self._bump_posts_version(user_id)
+        await self.db.commit()
         
-        return True
\ No newline at end of file
+        if deleted:
+            await mark_primary_write(user_id)
+        return sorted(deleted)
\ No newline at end of file
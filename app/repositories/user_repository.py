@@ -1,35 +1,86 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+import asyncio
+import logging
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Set
 from app.models.models import User
-from app.core.security import get_password_hash, verify_password
+from app.core.hashing import HashingUnavailable, password_hasher
+from app.core.security import password_needs_update
+from app.db.routing import mark_primary_write, on_replica
+
+logger = logging.getLogger(__name__)
+
+# Background rehash jobs, kept referenced until they finish
+_rehash_tasks: Set["asyncio.Task"] = set()
+
+async def _rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    """
+    Replace a user's password hash with one at the current bcrypt cost.
+    
+    The update only applies if the stored hash is still ``old_hash``, so a
+    password change made in the meantime is never overwritten.
+    
+    Args:
+        user_id (int): ID of the user
+        password (str): The verified plain-text password
+        old_hash (str): The hash the password was verified against
+    """
+    from app.db.database import SessionLocal
+    
+    try:
+        new_hash = await password_hasher.hash(password)
+    except HashingUnavailable:
+        # Upgrading is optional; try again on the next login
+        return
+        
+    async with SessionLocal() as db:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+def _rehash_done(task: "asyncio.Task") -> None:
+    _rehash_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Password rehash failed", exc_info=task.exception())
+
 
 class UserRepository:
     """
     Repository class for User-related database operations.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
         Initialize the repository with a database session.
         
         Args:
-            db (Session): SQLAlchemy database session
+            db (AsyncSession): SQLAlchemy async database session
         """
         self.db = db
     
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """
         Retrieve a user by email address.
         
+        Always read from the primary: it backs the duplicate check on signup
+        and login, and neither may miss an account created a moment ago on a
+        lagging replica.
+        
         Args:
             email (str): Email address to search for
             
         Returns:
             Optional[User]: User object if found, None otherwise
         """
-        return self.db.query(User).filter(User.email == email).first()
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """
         Retrieve a user by ID.
         
@@ -39,9 +90,11 @@ class UserRepository:
         Returns:
             Optional[User]: User object if found, None otherwise
         """
-        return self.db.query(User).filter(User.id == user_id).first()
+        statement = await on_replica(select(User).where(User.id == user_id), user_id)
+        result = await self.db.execute(statement)
+        return result.scalars().first()
     
-    def create_user(self, email: str, password: str) -> User:
+    async def create_user(self, email: str, password: str) -> User:
         """
         Create a new user with the given email and password.
         
@@ -51,33 +104,48 @@ class UserRepository:
             
         Returns:
             User: The created user object
+            
+        Raises:
+            HashingUnavailable: If the password hashing pool is saturated or restarting
         """
-        hashed_password = get_password_hash(password)
+        hashed_password = await password_hasher.hash(password)
         user = User(email=email, password=hashed_password)
         
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        await mark_primary_write(user.id)
         
         return user
     
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """
         Authenticate a user with email and password.
         
+        If the stored hash was made with an outdated bcrypt cost, it is upgraded
+        in the background without delaying the response.
+        
         Args:
             email (str): User's email address
             password (str): User's password
             
         Returns:
             Optional[User]: User object if authentication is successful, None otherwise
+            
+        Raises:
+            HashingUnavailable: If the password hashing pool is saturated or restarting
         """
-        user = self.get_user_by_email(email)
+        user = await self.get_user_by_email(email)
         
         if not user:
             return None
             
-        if not verify_password(password, user.password):
+        if not await password_hasher.verify(password, user.password):
             return None
             
+        if password_needs_update(user.password):
+            task = asyncio.create_task(_rehash_password(user.id, password, user.password))
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_done)
+            
         return user
\ No newline at end of file
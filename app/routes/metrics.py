@@ -0,0 +1,118 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict
+
+from app.core.cache import cache
+from app.core.hashing import password_hasher
+from app.core.metrics import Gauge, registry
+from app.db.compressed_text import codec_stats
+from app.db.database import engine, replica_engines
+from app.db.pool_metrics import pool_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+# Content type of the Prometheus text exposition format; the charset is appended
+EXPOSITION_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+DB_POOL_CONNECTIONS = registry.register(Gauge(
+    "db_pool_connections", "Connections of a database pool by state", ("pool", "state"),
+))
+HASHING_JOBS = registry.register(Gauge(
+    "password_hashing_jobs", "Password hashing jobs by state", ("state",),
+))
+CACHE_ENTRIES = registry.register(Gauge(
+    "cache_entries", "Entries held by the response cache",
+))
+POST_TEXT_CODEC_BYTES = registry.register(Gauge(
+    "post_text_codec_bytes", "Raw and stored size of the post texts compressed by this process", ("kind",),
+))
+POST_TEXT_CODEC_SECONDS = registry.register(Gauge(
+    "post_text_codec_seconds", "Time this process spent compressing and decompressing post texts",
+    ("operation",),
+))
+
+
+def _collect_runtime_gauges() -> None:
+    pools = [("primary", engine.pool)]
+    pools.extend((f"replica{i}", replica.pool) for i, replica in enumerate(replica_engines))
+    for name, pool in pools:
+        stats = pool_stats(pool)
+        DB_POOL_CONNECTIONS.set(stats["checked_out"], name, "checked_out")
+        DB_POOL_CONNECTIONS.set(stats["checked_in"], name, "checked_in")
+        DB_POOL_CONNECTIONS.set(stats["overflow"], name, "overflow")
+
+    hashing = password_hasher.stats()
+    HASHING_JOBS.set(hashing["running"], "running")
+    HASHING_JOBS.set(hashing["queued"], "queued")
+
+    CACHE_ENTRIES.set(cache.stats().get("entries", 0))
+
+    codec = codec_stats.snapshot()
+    POST_TEXT_CODEC_BYTES.set(codec["raw_bytes"], "raw")
+    POST_TEXT_CODEC_BYTES.set(codec["stored_bytes"], "stored")
+    POST_TEXT_CODEC_SECONDS.set(codec["compress_seconds"], "compress")
+    POST_TEXT_CODEC_SECONDS.set(codec["decompress_seconds"], "decompress")
+
+
+registry.add_collector(_collect_runtime_gauges)
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """
+    Get all metrics in the Prometheus text exposition format.
+
+    Returns:
+        PlainTextResponse: Request latency histograms and in-flight counts, time
+        per request phase (auth, db, serialization), query counts, cache
+        lookups, and connection pool, hashing and cache gauges
+    """
+    return PlainTextResponse(registry.render(), media_type=EXPOSITION_MEDIA_TYPE)
+
+
+@router.get("/cache")
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get response cache statistics.
+
+    Returns:
+        Dict: Entry and byte totals plus hits, misses, hit rate and evictions
+        per cache namespace
+    """
+    return cache.stats()
+
+@router.get("/db-pool")
+def get_db_pool_stats() -> Dict[str, Any]:
+    """
+    Get database connection pool statistics.
+
+    Returns:
+        Dict: Pool occupancy, overflow usage, checkout counts, timeouts and
+        checkout wait times of the primary, with the same figures for each read
+        replica under ``replicas`` when replicas are configured
+    """
+    stats = pool_stats(engine.pool)
+    if replica_engines:
+        stats["replicas"] = [pool_stats(replica.pool) for replica in replica_engines]
+    return stats
+
+@router.get("/hashing")
+def get_hashing_stats() -> Dict[str, Any]:
+    """
+    Get password hashing pool statistics.
+
+    Returns:
+        Dict: Jobs running and queued, completed and rejected counts, and
+        hashing latency
+    """
+    return password_hasher.stats()
+
+@router.get("/compression")
+def get_compression_stats() -> Dict[str, Any]:
+    """
+    Get post text compression statistics.
+
+    Returns:
+        Dict: Posts stored compressed and plain, their raw and stored size and
+        the resulting ratio, and time spent compressing and decompressing
+    """
+    return codec_stats.snapshot()
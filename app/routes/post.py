@@ -1,30 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from app.db.database import get_db
-from app.models.models import User
-from app.schemas.schemas import PostCreate, PostResponse, PostDelete
+from app.schemas.schemas import (
+    PostBatchCreate,
+    PostBatchDelete,
+    PostBatchDeleteResponse,
+    PostBatchResponse,
+    PostCreate,
+    PostDelete,
+    PostPage,
+    PostResponse,
+    PostSummaryPage,
+)
 from app.services.post_service import PostService
 from app.repositories.post_repository import PostRepository
-from app.core.auth import get_current_user
-from app.core.cache import timed_cache
+from app.core.auth import Principal, get_current_principal
+from app.core.cache import timed_cache, user_tag
+from app.core.text import utf8_size
+from app.core.config import settings
+from app.core.compression import compressed_response
 
 router = APIRouter(tags=["Posts"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def posts_cache_key(
+    current_user: Principal,
+    version: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    **kwargs
+) -> str:
+    """
+    Build the cache key for a page of a user's post listing.
+
+    Only the user's identity, the version of their posts and the page
+    parameters decide the result, so the database session and the principal
+    object itself are left out of the key. With the version in the key, a page
+    is only ever served under the ETag of the version it was built for.
+
+    Args:
+        current_user (Principal): Authenticated user
+        version (int): Version of the user's posts the page is built for
+        limit (int, optional): Requested page size
+        cursor (str, optional): Requested page cursor
+        **kwargs: Remaining endpoint arguments
+
+    Returns:
+        str: Cache key for the listing
+    """
+    return f"user:{current_user.id}:version:{version}:limit:{limit}:cursor:{cursor}:json"
+
+
+def posts_cache_tags(current_user: Principal, **kwargs) -> List[str]:
+    """
+    Tag a cached post listing with its owner so writes can invalidate it.
+
+    Args:
+        current_user (Principal): Authenticated user
+        **kwargs: Remaining endpoint arguments
+
+    Returns:
+        List[str]: Cache tags for the listing
+    """
+    return [user_tag(current_user.id)]
+
 @router.post("/posts", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
-def add_post(
+async def add_post(
     post_data: PostCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new post.
     
     Args:
         post_data (PostCreate): Post data with text content
-        current_user (User): Authenticated user creating the post
-        db (Session): Database session
+        current_user (Principal): Authenticated user creating the post
+        db (AsyncSession): Database session
         
     Returns:
         PostResponse: The created post
@@ -32,46 +89,356 @@ def add_post(
     post_repository = PostRepository(db)
     post_service = PostService(post_repository)
     
-    post = post_service.create_post(post_data.text, current_user)
+    post = await post_service.create_post(post_data.text, current_user)
     
     return PostResponse.from_orm(post)
 
-@router.get("/posts", response_model=List[PostResponse])
-@timed_cache(seconds=300)  # Cache for 5 minutes
+@router.post("/posts/batch", response_model=PostBatchResponse, status_code=status.HTTP_201_CREATED)
+async def add_posts(
+    batch: PostBatchCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create several posts in a single transaction.
+    
+    Args:
+        batch (PostBatchCreate): Posts to create
+        current_user (Principal): Authenticated user creating the posts
+        db (AsyncSession): Database session
+        
+    Returns:
+        PostBatchResponse: IDs of the created posts, in request order
+        
+    Raises:
+        HTTPException: If the combined size of the texts exceeds the batch limit
+    """
+    texts = [post.text for post in batch.posts]
+    if sum(utf8_size(text) for text in texts) > settings.POSTS_BATCH_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch payload exceeds {settings.POSTS_BATCH_MAX_BYTES} bytes"
+        )
+        
+    post_repository = PostRepository(db)
+    post_service = PostService(post_repository)
+    
+    ids = await post_service.create_posts(texts, current_user)
+    
+    return PostBatchResponse(ids=ids)
+
+@timed_cache(
+    seconds=300,  # Cache for 5 minutes
+    namespace="get_posts",
+    key_builder=posts_cache_key,
+    tags=posts_cache_tags
+)
+async def list_user_posts(
+    current_user: Principal,
+    version: int,
+    limit: Optional[int],
+    cursor: Optional[str],
+    db: AsyncSession
+) -> bytes:
+    """
+    Get a cached page of a user's posts, encoded as JSON.
+    
+    Args:
+        current_user (Principal): Authenticated user
+        version (int): Current version of the user's posts, only used in the cache key
+        limit (int, optional): Page size, defaults to ``settings.POSTS_PAGE_SIZE``
+        cursor (str, optional): ``next_cursor`` from the previous page
+        db (AsyncSession): Database session
+        
+    Returns:
+        bytes: The page in the shape of ``PostPage``
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    post_repository = PostRepository(db)
+    post_service = PostService(post_repository)
+    
+    try:
+        return await post_service.get_user_posts(
+            current_user, limit or settings.POSTS_PAGE_SIZE, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def posts_version_cache_key(current_user: Principal, **kwargs) -> str:
+    """
+    Build the cache key for the version of a user's posts.
+
+    Args:
+        current_user (Principal): Authenticated user
+        **kwargs: Remaining arguments
+
+    Returns:
+        str: Cache key for the version
+    """
+    return f"user:{current_user.id}"
+
+@timed_cache(
+    seconds=300,  # Cache for 5 minutes
+    namespace="posts_versions",
+    key_builder=posts_version_cache_key,
+    tags=posts_cache_tags
+)
+async def get_posts_version(current_user: Principal, db: AsyncSession) -> int:
+    """
+    Get the cached version of a user's posts.
+    
+    The version is invalidated together with the cached listings, so an
+    unchanged version means the listings are unchanged too.
+    
+    Args:
+        current_user (Principal): Authenticated user
+        db (AsyncSession): Database session
+        
+    Returns:
+        int: The version
+    """
+    return await PostService(PostRepository(db)).get_posts_version(current_user)
+
+def posts_etag(current_user: Principal, version: int) -> str:
+    """
+    Build the ETag of a user's post listings.
+    
+    The tag is weak because the same listing is sent with different content
+    encodings.
+    
+    Args:
+        current_user (Principal): Authenticated user
+        version (int): Version of the user's posts
+        
+    Returns:
+        str: The ETag header value
+    """
+    return f'W/"posts-{current_user.id}-{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, using weak comparison.
+    
+    Args:
+        if_none_match (str, optional): Header value, a list of ETags or ``*``
+        etag (str): Current ETag
+        
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+def wants_stream(request: Request, stream: bool) -> bool:
+    """
+    Decide whether a post listing should be streamed as NDJSON.
+    
+    Args:
+        request (Request): Incoming request
+        stream (bool): Value of the ``stream`` query flag
+        
+    Returns:
+        bool: True if the client asked for a stream
+    """
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+@router.get(
+    "/posts",
+    response_model=PostPage,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
 async def get_posts(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.POSTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, max_length=200),
+    stream: bool = Query(False, description="Stream every post as NDJSON"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all posts for the authenticated user.
+    Get a page of posts for the authenticated user, newest first.
+    
+    With ``?stream=true`` or ``Accept: application/x-ndjson`` the user's whole
+    history is streamed instead, one JSON object per line, without building
+    the full list in memory. Streams are not cached or paginated.
+    
+    Pages carry an ETag derived from the version of the user's posts. A
+    request whose ``If-None-Match`` still matches gets ``304 Not Modified``
+    without the posts being queried.
     
     Args:
-        current_user (User): Authenticated user
-        db (Session): Database session
+        request (Request): Incoming request
+        limit (int, optional): Page size, defaults to ``settings.POSTS_PAGE_SIZE``
+        cursor (str, optional): ``next_cursor`` from the previous page
+        stream (bool): Stream all posts as NDJSON
+        current_user (Principal): Authenticated user
+        db (AsyncSession): Database session
         
     Returns:
-        List[PostResponse]: List of the user's posts
+        PostPage: The user's posts on this page and the cursor for the next one,
+        a streaming NDJSON response, or an empty 304 response
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    if wants_stream(request, stream):
+        post_service = PostService(PostRepository(db))
+        return StreamingResponse(
+            post_service.stream_user_posts(current_user),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    
+    # Pages are cached per version, so the page sent is never older than its ETag
+    version = await get_posts_version(current_user=current_user, db=db)
+    etag = posts_etag(current_user, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Vary": "Accept-Encoding"}
+        )
+    
+    # The page is already encoded, so FastAPI doesn't revalidate it against PostPage
+    body = await list_user_posts(
+        current_user=current_user, version=version, limit=limit, cursor=cursor, db=db
+    )
+    response = await compressed_response(request, body, cached=True)
+    response.headers["ETag"] = etag
+    return response
+
+def post_summaries_cache_key(
+    current_user: Principal,
+    version: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    preview: int = 0,
+    **kwargs
+) -> str:
+    """
+    Build the cache key for a page of a user's post summaries.
+
+    Args:
+        current_user (Principal): Authenticated user
+        version (int): Version of the user's posts the page is built for
+        limit (int, optional): Requested page size
+        cursor (str, optional): Requested page cursor
+        preview (int): Requested preview length
+        **kwargs: Remaining endpoint arguments
+
+    Returns:
+        str: Cache key for the listing
+    """
+    return (
+        f"user:{current_user.id}:version:{version}:limit:{limit}:cursor:{cursor}"
+        f":preview:{preview}:json"
+    )
+
+@timed_cache(
+    seconds=300,  # Cache for 5 minutes
+    namespace="get_post_summaries",
+    key_builder=post_summaries_cache_key,
+    tags=posts_cache_tags
+)
+async def list_post_summaries(
+    current_user: Principal,
+    version: int,
+    limit: Optional[int],
+    cursor: Optional[str],
+    preview: int,
+    db: AsyncSession
+) -> bytes:
+    """
+    Get a cached page of a user's post summaries, encoded as JSON.
+    
+    Args:
+        current_user (Principal): Authenticated user
+        version (int): Current version of the user's posts, only used in the cache key
+        limit (int, optional): Page size, defaults to ``settings.POSTS_PAGE_SIZE``
+        cursor (str, optional): ``next_cursor`` from the previous page
+        preview (int): Number of leading text characters to include, 0 for none
+        db (AsyncSession): Database session
+        
+    Returns:
+        bytes: The page in the shape of ``PostSummaryPage``
+        
+    Raises:
+        HTTPException: If the cursor is malformed
     """
     post_repository = PostRepository(db)
     post_service = PostService(post_repository)
     
-    posts = await post_service.get_user_posts(current_user)
+    try:
+        return await post_service.get_user_post_summaries(
+            current_user, limit or settings.POSTS_PAGE_SIZE, cursor, preview
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/posts/summary", response_model=PostSummaryPage)
+async def get_post_summaries(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.POSTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, max_length=200),
+    preview: int = Query(0, ge=0, le=settings.POSTS_MAX_PREVIEW_CHARS,
+                         description="Number of leading text characters to include"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a page of post summaries for the authenticated user, newest first.
     
-    return posts
+    Summaries carry ids and timestamps and, optionally, a short preview of the
+    text, so timelines can be listed without loading full post bodies.
+    
+    Args:
+        request (Request): Incoming request
+        limit (int, optional): Page size, defaults to ``settings.POSTS_PAGE_SIZE``
+        cursor (str, optional): ``next_cursor`` from the previous page
+        preview (int): Number of leading text characters to include, 0 for none
+        current_user (Principal): Authenticated user
+        db (AsyncSession): Database session
+        
+    Returns:
+        PostSummaryPage: The summaries on this page and the cursor for the next one
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    version = await get_posts_version(current_user=current_user, db=db)
+    body = await list_post_summaries(
+        current_user=current_user, version=version, limit=limit, cursor=cursor,
+        preview=preview, db=db
+    )
+    return await compressed_response(request, body, cached=True)
 
 @router.delete("/posts", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
     post_data: PostDelete,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a post.
     
     Args:
         post_data (PostDelete): Post deletion data with post_id
-        current_user (User): Authenticated user who owns the post
-        db (Session): Database session
+        current_user (Principal): Authenticated user who owns the post
+        db (AsyncSession): Database session
         
     Returns:
         None
@@ -82,10 +449,36 @@ def delete_post(
     post_repository = PostRepository(db)
     post_service = PostService(post_repository)
     
-    deleted = post_service.delete_post(post_data.post_id, current_user)
+    deleted = await post_service.delete_post(post_data.post_id, current_user)
     
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found or doesn't belong to the authenticated user"
-        )
\ No newline at end of file
+        )
+
+@router.delete("/posts/batch", response_model=PostBatchDeleteResponse)
+async def delete_posts(
+    post_data: PostBatchDelete,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete several posts at once.
+    
+    Posts that do not exist or belong to another user are skipped.
+    
+    Args:
+        post_data (PostBatchDelete): IDs of the posts to delete
+        current_user (Principal): Authenticated user who owns the posts
+        db (AsyncSession): Database session
+        
+    Returns:
+        PostBatchDeleteResponse: IDs of the posts that were deleted
+    """
+    post_repository = PostRepository(db)
+    post_service = PostService(post_repository)
+    
+    deleted = await post_service.delete_posts(post_data.post_ids, current_user)
+    
+    return PostBatchDeleteResponse(deleted=deleted)
@@ -1,58 +1,80 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
 from app.schemas.schemas import UserCreate, Token
 from app.services.user_service import UserService
 from app.repositories.user_repository import UserRepository
+from app.core.config import settings
+from app.core.hashing import HashingUnavailable
 
 router = APIRouter(tags=["Authentication"])
 
+def hashing_unavailable() -> HTTPException:
+    """
+    Build the error returned when the password hashing pool is saturated or restarting.
+    
+    Returns:
+        HTTPException: 503 response asking the client to retry shortly
+    """
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": str(settings.HASH_RETRY_AFTER_SECONDS)},
+    )
+
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
-def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Register a new user.
     
     Args:
         user_data (UserCreate): User registration data with email and password
-        db (Session): Database session
+        db (AsyncSession): Database session
         
     Returns:
         Token: Access token for the new user
         
     Raises:
-        HTTPException: If the email is already registered
+        HTTPException: If the email is already registered or password hashing
+            is unavailable
     """
     user_repository = UserRepository(db)
     user_service = UserService(user_repository)
     
     try:
-        token = user_service.register_user(user_data.email, user_data.password)
+        token = await user_service.register_user(user_data.email, user_data.password)
         return token
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HashingUnavailable:
+        raise hashing_unavailable()
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserCreate, db: Session = Depends(get_db)):
+async def login(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Authenticate a user and return an access token.
     
     Args:
         user_data (UserCreate): User login data with email and password
-        db (Session): Database session
+        db (AsyncSession): Database session
         
     Returns:
         Token: Access token upon successful login
         
     Raises:
-        HTTPException: If the credentials are invalid
+        HTTPException: If the credentials are invalid or password hashing is
+            unavailable
     """
     user_repository = UserRepository(db)
     user_service = UserService(user_repository)
     
-    token = user_service.authenticate_user(user_data.email, user_data.password)
+    try:
+        token = await user_service.authenticate_user(user_data.email, user_data.password)
+    except HashingUnavailable:
+        raise hashing_unavailable()
     
     if not token:
         raise HTTPException(
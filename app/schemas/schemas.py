@@ -1,6 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import List, Optional
 from datetime import datetime
+from app.core.text import utf8_size
+from app.core.config import settings
 
 
 class UserBase(BaseModel):
@@ -68,10 +70,11 @@ class PostBase(BaseModel):
     
     @validator('text')
     def check_payload_size(cls, v):
-        """Validate that post payload is under 1MB."""
-        # Rough estimate: 1 character = 1 byte
-        if len(v.encode('utf-8')) > 1024 * 1024:  # 1 MB
-            raise ValueError('Post payload exceeds 1 MB limit')
+        """Validate that post payload is at most POST_MAX_BYTES in UTF-8."""
+        # A character takes 1 to 4 bytes in UTF-8, so only texts in between need counting
+        limit = settings.POST_MAX_BYTES
+        if len(v) > limit or (len(v) * 4 > limit and utf8_size(v) > limit):
+            raise ValueError(f'Post payload exceeds {limit} bytes')
         return v  
     
     
@@ -80,23 +83,93 @@ class PostCreate(PostBase):
     pass
 
 
-class PostResponse(PostBase):
+class PostBatchCreate(BaseModel):
+    """
+    Pydantic model for creating several posts at once.
+    
+    Attributes:
+        posts (List[PostCreate]): Posts to create, in order
+    """
+    posts: List[PostCreate] = Field(
+        ..., min_length=1, max_length=settings.POSTS_BATCH_MAX_ITEMS, description="Posts to create"
+    )
+
+
+class PostBatchResponse(BaseModel):
+    """
+    Pydantic model for the result of a batch create.
+    
+    Attributes:
+        ids (List[int]): IDs of the created posts, in request order
+    """
+    ids: List[int]
+
+
+class PostResponse(BaseModel):
     """
     Pydantic model for post response data.
     
+    Post text read back from the database was validated when it was written,
+    so unlike ``PostBase`` this model has no validators.
+    
+    Attributes:
+        text (str): Content of the post
+        id (int): Post ID
+        user_id (int): ID of the user who created the post
+        created_at (datetime): Timestamp when the post was created
+    """
+    text: str
+    id: int
+    user_id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PostPage(BaseModel):
+    """
+    Pydantic model for a page of posts.
+    
+    Attributes:
+        items (List[PostResponse]): Posts on this page, newest first
+        next_cursor (Optional[str]): Cursor for the next page, None on the last page
+    """
+    items: List[PostResponse]
+    next_cursor: Optional[str] = None
+
+
+class PostSummary(BaseModel):
+    """
+    Pydantic model for a post listed without its full text.
+    
     Attributes:
         id (int): Post ID
         user_id (int): ID of the user who created the post
         created_at (datetime): Timestamp when the post was created
+        preview (Optional[str]): Leading characters of the post text, if requested
     """
     id: int
     user_id: int
     created_at: datetime
+    preview: Optional[str] = None
     
     class Config:
         from_attributes = True
 
 
+class PostSummaryPage(BaseModel):
+    """
+    Pydantic model for a page of post summaries.
+    
+    Attributes:
+        items (List[PostSummary]): Post summaries on this page, newest first
+        next_cursor (Optional[str]): Cursor for the next page, None on the last page
+    """
+    items: List[PostSummary]
+    next_cursor: Optional[str] = None
+
+
 class PostDelete(BaseModel):
     """
     Pydantic model for post deletion request.
@@ -104,4 +177,26 @@ class PostDelete(BaseModel):
     Attributes:
         post_id (int): ID of the post to delete
     """
-    post_id: int = Field(..., gt=0, description="ID of the post to delete")
\ No newline at end of file
+    post_id: int = Field(..., gt=0, description="ID of the post to delete")
+
+
+class PostBatchDelete(BaseModel):
+    """
+    Pydantic model for deleting several posts at once.
+    
+    Attributes:
+        post_ids (List[int]): IDs of the posts to delete
+    """
+    post_ids: List[int] = Field(
+        ..., min_length=1, max_length=settings.POSTS_BATCH_MAX_ITEMS, description="IDs of the posts to delete"
+    )
+
+
+class PostBatchDeleteResponse(BaseModel):
+    """
+    Pydantic model for the result of a batch delete.
+    
+    Attributes:
+        deleted (List[int]): IDs of the posts that were deleted
+    """
+    deleted: List[int]
\ No newline at end of file
@@ -1,7 +1,12 @@
-from typing import List
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from app.repositories.post_repository import PostRepository
-from app.models.models import Post, User
-from app.schemas.schemas import PostResponse
+from app.models.models import Post
+from app.core.auth import Principal
+from app.core.cache import cache, user_tag
+from app.core.config import settings
+from app.core.metrics import track
+from app.core.serialization import encode_post_line, encode_post_page, encode_post_summary_page
+from app.core.pagination import encode_cursor, decode_cursor
 
 class PostService:
     """
@@ -17,41 +22,186 @@ class PostService:
         """
         self.post_repository = post_repository
     
-    def create_post(self, text: str, user: User) -> Post:
+    async def create_post(self, text: str, user: Principal) -> Post:
         """
         Create a new post for a user.
         
+        Cached listings of the user's posts are invalidated so the new post is
+        visible on the next read.
+        
         Args:
             text (str): Content of the post
-            user (User): User creating the post
+            user (Principal): User creating the post
             
         Returns:
             Post: The created post object
         """
-        return self.post_repository.create_post(text, user.id)
+        post = await self.post_repository.create_post(text, user.id)
+        await cache.ainvalidate_tags(user_tag(user.id))
+        return post
+    
+    async def create_posts(self, texts: List[str], user: Principal) -> List[int]:
+        """
+        Create several posts for a user at once.
+        
+        Args:
+            texts (List[str]): Contents of the posts, in order
+            user (Principal): User creating the posts
+            
+        Returns:
+            List[int]: IDs of the created posts, in the order of ``texts``
+        """
+        ids = await self.post_repository.create_posts(texts, user.id)
+        await cache.ainvalidate_tags(user_tag(user.id))
+        return ids
     
-    async def get_user_posts(self, user: User) -> List[PostResponse]:
+    async def get_posts_version(self, user: Principal) -> int:
         """
-        Get all posts for a user.
+        Get the version of a user's posts, which changes on every create and delete.
         
         Args:
-            user (User): User to get posts for
+            user (Principal): User whose posts are versioned
             
         Returns:
-            List[PostResponse]: List of post response objects
+            int: The version
         """
-        posts = self.post_repository.get_user_posts(user.id)
-        return [PostResponse.from_orm(post) for post in posts]
+        return await self.post_repository.get_posts_version(user.id)
     
-    def delete_post(self, post_id: int, user: User) -> bool:
+    async def get_user_posts(
+        self,
+        user: Principal,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> bytes:
+        """
+        Get a page of posts for a user, newest first, encoded as JSON.
+        
+        The rows come from our own database, so they are encoded directly
+        instead of being validated into response models first.
+        
+        Args:
+            user (Principal): User to get posts for
+            limit (int): Maximum number of posts on the page
+            cursor (str, optional): Cursor returned with the previous page
+            
+        Returns:
+            bytes: The page in the shape of ``PostPage``
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+        
+        # Fetch one extra row to learn whether another page follows
+        posts = await self.post_repository.get_user_posts(user.id, limit + 1, after)
+        posts, next_cursor = self._paginate(posts, limit)
+        
+        with track("serialization"):
+            return encode_post_page(posts, next_cursor)
+    
+    async def get_user_post_summaries(
+        self,
+        user: Principal,
+        limit: int,
+        cursor: Optional[str] = None,
+        preview_chars: int = 0
+    ) -> bytes:
+        """
+        Get a page of post summaries for a user, newest first, encoded as JSON.
+        
+        Args:
+            user (Principal): User to get posts for
+            limit (int): Maximum number of posts on the page
+            cursor (str, optional): Cursor returned with the previous page
+            preview_chars (int): Number of leading text characters to include
+            
+        Returns:
+            bytes: The page in the shape of ``PostSummaryPage``
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else None
+        
+        rows = await self.post_repository.get_user_post_summaries(
+            user.id, limit + 1, after, preview_chars
+        )
+        rows, next_cursor = self._paginate(rows, limit)
+        
+        with track("serialization"):
+            return encode_post_summary_page(rows, next_cursor)
+    
+    @staticmethod
+    def _paginate(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+        """
+        Trim a page fetched with one extra row and build the next page's cursor.
+        
+        Args:
+            rows (List): Up to ``limit + 1`` posts or rows, newest first
+            limit (int): Page size
+            
+        Returns:
+            Tuple[List, Optional[str]]: The page and the cursor for the next one
+        """
+        if len(rows) <= limit:
+            return rows, None
+        
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    async def stream_user_posts(self, user: Principal) -> AsyncIterator[bytes]:
+        """
+        Stream all posts of a user as newline-delimited JSON.
+        
+        Each post is encoded as soon as its row arrives from the database, so
+        only one batch of rows is held in memory at a time.
+        
+        Args:
+            user (Principal): User to get posts for
+            
+        Yields:
+            bytes: One JSON-encoded post followed by a newline
+        """
+        rows = self.post_repository.stream_user_posts(
+            user.id, settings.POSTS_STREAM_BATCH_SIZE
+        )
+        async for row in rows:
+            with track("serialization"):
+                line = encode_post_line(row)
+            yield line
+    
+    async def delete_post(self, post_id: int, user: Principal) -> bool:
         """
         Delete a post if it belongs to the user.
         
+        Cached listings of the user's posts are invalidated when a post is removed.
+        
         Args:
             post_id (int): ID of the post to delete
-            user (User): User who owns the post
+            user (Principal): User who owns the post
             
         Returns:
             bool: True if the post was deleted, False otherwise
         """
-        return self.post_repository.delete_post(post_id, user.id)
\ No newline at end of file
+        deleted = await self.post_repository.delete_post(post_id, user.id)
+        if deleted:
+            await cache.ainvalidate_tags(user_tag(user.id))
+        return deleted
+    
+    async def delete_posts(self, post_ids: List[int], user: Principal) -> List[int]:
+        """
+        Delete several of a user's posts at once.
+        
+        IDs of posts that do not exist or belong to another user are ignored.
+        
+        Args:
+            post_ids (List[int]): IDs of the posts to delete
+            user (Principal): User who owns the posts
+            
+        Returns:
+            List[int]: IDs of the posts that were deleted
+        """
+        deleted = await self.post_repository.delete_posts(sorted(set(post_ids)), user.id)
+        if deleted:
+            await cache.ainvalidate_tags(user_tag(user.id))
+        return deleted
\ No newline at end of file
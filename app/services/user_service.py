@@ -3,6 +3,7 @@ from datetime import timedelta
 from app.repositories.user_repository import UserRepository
 from app.core.security import create_access_token
 from app.core.config import settings
+from app.models.models import User
 from app.schemas.schemas import Token
 
 class UserService:
@@ -19,7 +20,7 @@ class UserService:
         """
         self.user_repository = user_repository
     
-    def register_user(self, email: str, password: str) -> Token:
+    async def register_user(self, email: str, password: str) -> Token:
         """
         Register a new user and generate an access token.
         
@@ -34,22 +35,16 @@ class UserService:
             ValueError: If the email is already registered
         """
         # Check if user already exists
-        existing_user = self.user_repository.get_user_by_email(email)
+        existing_user = await self.user_repository.get_user_by_email(email)
         if existing_user:
             raise ValueError("Email already registered")
         
         # Create new user
-        user = self.user_repository.create_user(email, password)
+        user = await self.user_repository.create_user(email, password)
         
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": user.id},
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
-        
-        return Token(access_token=access_token, token_type="bearer")
+        return self._issue_token(user)
     
-    def authenticate_user(self, email: str, password: str) -> Optional[Token]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[Token]:
         """
         Authenticate a user and generate an access token.
         
@@ -60,15 +55,30 @@ class UserService:
         Returns:
             Optional[Token]: Access token if authentication is successful, None otherwise
         """
-        user = self.user_repository.authenticate_user(email, password)
+        user = await self.user_repository.authenticate_user(email, password)
         
         if not user:
             return None
         
-        # Create access token
+        return self._issue_token(user)
+    
+    @staticmethod
+    def _issue_token(user: User) -> Token:
+        """
+        Create an access token for a user.
+        
+        The token carries the claims needed to build a principal without
+        loading the user again (see ``get_current_principal``).
+        
+        Args:
+            user (User): The authenticated user
+            
+        Returns:
+            Token: Access token for the user
+        """
         access_token = create_access_token(
-            data={"sub": user.id},
+            data={"sub": str(user.id), "email": user.email},
             expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         )
         
-        return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
+        return Token(access_token=access_token, token_type="bearer")
@@ -0,0 +1,80 @@
+import json
+import math
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile of a list of values.
+
+    Args:
+        values (List[float]): Sample values, in any order
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(seconds: List[float], unit: str = "ms") -> Dict[str, Any]:
+    """
+    Summarize latency samples.
+
+    Args:
+        seconds (List[float]): Latencies in seconds
+        unit (str): "ms" or "us", the unit of the reported figures
+
+    Returns:
+        Dict: Sample count and mean, p50, p99 and max latency, with the unit
+        as key suffix (e.g. ``p99_ms``)
+    """
+    scale = 1e3 if unit == "ms" else 1e6
+    return {
+        "count": len(seconds),
+        f"mean_{unit}": round(sum(seconds) / len(seconds) * scale, 3) if seconds else 0.0,
+        f"p50_{unit}": round(percentile(seconds, 50) * scale, 3),
+        f"p99_{unit}": round(percentile(seconds, 99) * scale, 3),
+        f"max_{unit}": round(max(seconds) * scale, 3) if seconds else 0.0,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """
+    Describe where a benchmark ran, so reports from different machines aren't confused.
+
+    Returns:
+        Dict: Timestamp, Python version and platform
+    """
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+    }
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]) -> None:
+    """
+    Write a report as JSON to a file, or to stdout if no file is given.
+
+    Args:
+        report (Dict): The report
+        output (str, optional): Path of the file to write
+    """
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,75 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+"""
+Compare two benchmark reports and flag regressions.
+
+Works with the reports of ``benchmarks.micro`` and ``benchmarks.load``:
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+
+Exits with status 1 if any p50 or p99 latency grew by more than the threshold.
+"""
+
+# Report sections holding per-benchmark or per-route latency summaries
+_SECTIONS = ("benchmarks", "routes")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float) -> List[Tuple[str, str, float, float, float, bool]]:
+    """
+    Compare the p50 and p99 latencies present in both reports.
+
+    Args:
+        baseline (Dict): Earlier report
+        current (Dict): Report to check
+        threshold (float): Relative slowdown above which a metric regresses,
+            e.g. 0.1 for 10%
+
+    Returns:
+        List[Tuple]: (name, metric, baseline, current, relative change,
+        regressed) for every metric found in both reports
+    """
+    rows = []
+    for section in _SECTIONS:
+        old_entries = baseline.get(section, {})
+        for name, new in current.get(section, {}).items():
+            old = old_entries.get(name)
+            if old is None:
+                continue
+            for metric in sorted(new):
+                if not metric.startswith(("p50_", "p99_")) or metric not in old:
+                    continue
+                before, after = old[metric], new[metric]
+                change = (after - before) / before if before else 0.0
+                rows.append((name, metric, before, after, change, change > threshold))
+    return rows
+
+
+def main() -> None:
+    """Compare two reports from the command line."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline", help="Report to compare against")
+    parser.add_argument("current", help="Report to check")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    for name, metric, before, after, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:40} {metric:8} {before:12.3f} -> {after:12.3f} {change:+8.1%} {flag}")
+
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
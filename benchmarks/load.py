@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.common import environment, summarize, write_report
+
+"""
+In-process load generator for the API.
+
+Virtual users sign up, log in and then run a mix of post requests against the
+ASGI app directly, without a network or server process in between. Latency is
+recorded per route and reported as JSON. Run from the project root:
+
+    python -m benchmarks.load --users 20 --iterations 50 --output load.json
+
+By default a fresh SQLite database in a temporary directory is used (requires
+aiosqlite); pass ``--database-url`` to run against a MySQL stand-in instead.
+Requires httpx.
+"""
+
+
+class Recorder:
+    """
+    Collects request latencies and failures per route.
+
+    Attributes:
+        latencies (Dict[str, List[float]]): Seconds taken by each request, by route
+        errors (Dict[str, int]): Number of failed requests, by route
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: Any, route: str, method: str, url: str,
+                      expected: Tuple[int, ...] = (200, 201, 204), **kwargs) -> Optional[Any]:
+        """
+        Send a request and record how long it took.
+
+        Args:
+            client (httpx.AsyncClient): Client bound to the app
+            route (str): Label the latency is recorded under
+            method (str): HTTP method
+            url (str): Request URL
+            expected (Tuple[int, ...]): Status codes that count as success
+            **kwargs: Passed on to ``client.request``
+
+        Returns:
+            Optional[httpx.Response]: The response, or None if the request failed
+        """
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+
+        if response.status_code not in expected:
+            self.errors[route] += 1
+            return None
+        return response
+
+
+async def virtual_user(client: Any, recorder: Recorder, email: str, iterations: int,
+                       batch_size: int, text: str) -> None:
+    """
+    Sign up, log in and exercise every post route.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the app
+        recorder (Recorder): Where latencies are recorded
+        email (str): Unique email address of this user
+        iterations (int): Number of rounds of post requests
+        batch_size (int): Posts per batch create request
+        text (str): Text of every created post
+    """
+    credentials = {"email": email, "password": "benchmark-password"}
+    if await recorder.request(client, "POST /signup", "POST", "/signup", json=credentials) is None:
+        return
+    response = await recorder.request(client, "POST /login", "POST", "/login", json=credentials)
+    if response is None:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    for _ in range(iterations):
+        created = await recorder.request(
+            client, "POST /posts", "POST", "/posts", json={"text": text}, headers=headers
+        )
+        batch = await recorder.request(
+            client, "POST /posts/batch", "POST", "/posts/batch",
+            json={"posts": [{"text": text}] * batch_size}, headers=headers,
+        )
+
+        page = await recorder.request(client, "GET /posts", "GET", "/posts?limit=20", headers=headers)
+        if page is not None and page.json()["next_cursor"]:
+            await recorder.request(
+                client, "GET /posts (next page)", "GET", "/posts",
+                params={"limit": 20, "cursor": page.json()["next_cursor"]}, headers=headers,
+            )
+        await recorder.request(
+            client, "GET /posts/summary", "GET", "/posts/summary?limit=20&preview=80", headers=headers
+        )
+        await recorder.request(client, "GET /posts?stream", "GET", "/posts?stream=true", headers=headers)
+
+        if created is not None:
+            await recorder.request(
+                client, "DELETE /posts", "DELETE", "/posts",
+                json={"post_id": created.json()["id"]}, headers=headers,
+            )
+        if batch is not None:
+            # Keep half of each batch so listings grow to several pages
+            ids = batch.json()["ids"]
+            await recorder.request(
+                client, "DELETE /posts/batch", "DELETE", "/posts/batch",
+                json={"post_ids": ids[:max(len(ids) // 2, 1)]}, headers=headers,
+            )
+
+
+async def run(users: int, iterations: int, batch_size: int, text_bytes: int) -> Dict[str, Any]:
+    """
+    Run the load test against the app configured by the environment.
+
+    Args:
+        users (int): Number of concurrent virtual users
+        iterations (int): Rounds of post requests per user
+        batch_size (int): Posts per batch create request
+        text_bytes (int): Size of each post's text
+
+    Returns:
+        Dict: Report with request totals, throughput and per-route latency
+    """
+    import httpx
+    from app.main import app
+
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    text = "x" * text_bytes
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                virtual_user(client, recorder, f"bench-{run_id}-{i}@example.com",
+                             iterations, batch_size, text)
+                for i in range(users)
+            ))
+            elapsed = time.perf_counter() - start
+
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        routes[route] = summarize(latencies, unit="ms")
+        routes[route]["errors"] = recorder.errors.get(route, 0)
+        routes[route]["requests_per_second"] = round(len(latencies) / elapsed, 1)
+
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "environment": environment(),
+        "config": {
+            "users": users,
+            "iterations": iterations,
+            "batch_size": batch_size,
+            "text_bytes": text_bytes,
+            "database": os.environ["DATABASE_URL"].split("://")[0],
+        },
+        "duration_seconds": round(elapsed, 3),
+        "requests": total,
+        "errors": sum(recorder.errors.values()),
+        "throughput_rps": round(total / elapsed, 1),
+        "routes": routes,
+    }
+
+
+def main() -> None:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="Drive the API in-process and report latency.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=20, help="Rounds of post requests per user")
+    parser.add_argument("--batch-size", type=int, default=10, help="Posts per batch create request")
+    parser.add_argument("--text-bytes", type=int, default=280, help="Size of each post's text")
+    parser.add_argument("--database-url", help="Async database URL; defaults to a temporary SQLite file")
+    parser.add_argument("--bcrypt-rounds", type=int,
+                        help="bcrypt cost for the run; lower it to focus on the post routes")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    # Settings are read when the app is imported, so configure it first
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tmp}/benchmark.db"
+        os.environ["DB_CREATE_SCHEMA_ON_STARTUP"] = "true"
+        if args.bcrypt_rounds is not None:
+            os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+        report = asyncio.run(run(args.users, args.iterations, args.batch_size, args.text_bytes))
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.common import environment, summarize, write_report
+
+"""
+Micro-benchmarks for the functions on the hot path of every request.
+
+Each benchmark runs an operation in batches and reports the per-operation
+latency of the batches along with the throughput. Run from the project root:
+
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro --only token
+
+Compare two reports with ``python -m benchmarks.compare``.
+"""
+
+
+def _measure(func: Callable[[], Any], samples: int, number: int) -> List[float]:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def _measure_async(func: Callable[[], Awaitable[Any]], samples: int, number: int) -> List[float]:
+    async def run() -> List[float]:
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            for _ in range(number):
+                await func()
+            timings.append((time.perf_counter() - start) / number)
+        return timings
+
+    return asyncio.run(run())
+
+
+def token_benchmarks(samples: int, number: int) -> Dict[str, List[float]]:
+    """Create and verify access tokens."""
+    from app.core.security import create_access_token, decode_access_token
+
+    claims = {"sub": "42", "email": "bench@example.com"}
+    token = create_access_token(claims, timedelta(minutes=30))
+    return {
+        "create_access_token": _measure(lambda: create_access_token(claims), samples, number),
+        "decode_access_token": _measure(lambda: decode_access_token(token), samples, number),
+    }
+
+
+def auth_benchmarks(samples: int, number: int) -> Dict[str, List[float]]:
+    """Resolve the current user from a token that is already in the token cache."""
+    from app.core.auth import TOKEN_CACHE_NAMESPACE, get_current_user, token_cache_key
+    from app.core.cache import cache
+    from app.core.security import create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "42", "email": "bench@example.com"}, timedelta(minutes=30))
+    cache.set(
+        token_cache_key(token),
+        {"id": 42, "email": "bench@example.com", "claims": decode_access_token(token)},
+        600,
+        TOKEN_CACHE_NAMESPACE,
+    )
+    return {
+        "get_current_user_cached": _measure_async(
+            lambda: get_current_user(token, None), samples, number
+        ),
+    }
+
+
+def serialization_benchmarks(samples: int, number: int, posts: int) -> Dict[str, List[float]]:
+    """Serialize a large list of posts."""
+    from app.core.serialization import encode_post_page
+    from app.models.models import Post
+    from app.schemas.schemas import PostPage, PostResponse
+
+    now = datetime.utcnow()
+    rows = [
+        Post(id=i, user_id=1, text="x" * 280, created_at=now - timedelta(seconds=i))
+        for i in range(posts)
+    ]
+
+    def page_json() -> str:
+        return PostPage(items=[PostResponse.from_orm(row) for row in rows]).model_dump_json()
+
+    return {
+        f"post_response_from_orm_x{posts}": _measure(
+            lambda: [PostResponse.from_orm(row) for row in rows], samples, number
+        ),
+        f"post_page_json_x{posts}": _measure(page_json, samples, number),
+        f"encode_post_page_x{posts}": _measure(lambda: encode_post_page(rows, None), samples, number),
+    }
+
+
+def validation_benchmarks(samples: int, number: int) -> Dict[str, List[float]]:
+    """Validate 1 MB post bodies, which runs the payload size check."""
+    from app.schemas.schemas import PostCreate
+
+    ascii_body = "a" * 1_000_000
+    multibyte_body = "€" * 333_333  # 3 bytes per character in UTF-8
+    return {
+        "post_create_1mb_ascii": _measure(lambda: PostCreate(text=ascii_body), samples, number),
+        "post_create_1mb_multibyte": _measure(lambda: PostCreate(text=multibyte_body), samples, number),
+    }
+
+
+def cache_benchmarks(samples: int, number: int) -> Dict[str, List[float]]:
+    """Look up and store entries in the cache engine and through ``timed_cache``."""
+    from app.core.cache import timed_cache
+    from app.core.cache_engine import CacheEngine
+
+    engine = CacheEngine(max_entries=100_000, max_bytes=256 * 1024 * 1024, sweep_interval=60)
+    value = {"items": list(range(50)), "next_cursor": None}
+    for i in range(10_000):
+        engine.set(f"key:{i}", value, 600, "bench")
+
+    counter = iter(range(10**9))
+
+    @timed_cache(seconds=600, namespace="bench_timed_cache", key_builder=lambda n: str(n))
+    async def cached(n: int) -> Dict[str, Any]:
+        return value
+
+    asyncio.run(cached(1))
+
+    return {
+        "cache_get_hit": _measure(lambda: engine.get("key:5000", "bench"), samples, number),
+        "cache_get_miss": _measure(lambda: engine.get("missing", "bench"), samples, number),
+        "cache_set": _measure(
+            lambda: engine.set(f"new:{next(counter) % 10_000}", value, 600, "bench"), samples, number
+        ),
+        "timed_cache_hit": _measure_async(lambda: cached(1), samples, number),
+    }
+
+
+GROUPS = {
+    "token": token_benchmarks,
+    "auth": auth_benchmarks,
+    "serialization": serialization_benchmarks,
+    "validation": validation_benchmarks,
+    "cache": cache_benchmarks,
+}
+
+
+def run(groups: List[str], samples: int, number: int, posts: int) -> Dict[str, Any]:
+    """
+    Run the selected benchmark groups.
+
+    Args:
+        groups (List[str]): Names of the groups to run, see ``GROUPS``
+        samples (int): Number of timed batches per benchmark
+        number (int): Operations per batch; divided down for expensive groups
+        posts (int): Number of posts serialized by the serialization group
+
+    Returns:
+        Dict: Report with per-operation latency in microseconds and
+        operations per second for each benchmark
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for group in groups:
+        if group == "serialization":
+            timings = serialization_benchmarks(samples, max(number // 100, 1), posts)
+        elif group == "validation":
+            timings = validation_benchmarks(samples, max(number // 100, 1))
+        else:
+            timings = GROUPS[group](samples, number)
+
+        for name, seconds in timings.items():
+            summary = summarize(seconds, unit="us")
+            summary["ops_per_second"] = round(1 / (sum(seconds) / len(seconds)), 1)
+            results[name] = summary
+
+    return {
+        "environment": environment(),
+        "config": {"samples": samples, "number": number, "posts": posts},
+        "benchmarks": results,
+    }
+
+
+def main() -> None:
+    """Run the micro-benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks of hot-path functions.")
+    parser.add_argument("--only", nargs="+", choices=sorted(GROUPS), default=list(GROUPS),
+                        help="Benchmark groups to run")
+    parser.add_argument("--samples", type=int, default=20, help="Timed batches per benchmark")
+    parser.add_argument("--number", type=int, default=1000, help="Operations per batch")
+    parser.add_argument("--posts", type=int, default=1000, help="Posts per serialization run")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    write_report(run(args.only, args.samples, args.number, args.posts), args.output)
+
+
+if __name__ == "__main__":
+    main()
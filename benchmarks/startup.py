@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+Measure worker cold-start time.
+
+Each run starts a fresh interpreter, imports ``app.main`` and runs the
+application's lifespan startup, which is what a new worker does before it can
+serve its first request. Run from the project root:
+
+    python -m benchmarks.startup --runs 10
+
+The schema is not created during the measurement; bootstrap the database first
+if the lifespan is configured to need it.
+"""
+
+_PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def startup():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import_seconds": imported - start, "ready_seconds": ready - start}))
+"""
+
+
+def measure(runs: int) -> dict:
+    """
+    Start the application ``runs`` times and summarize how long it took.
+
+    Args:
+        runs (int): Number of cold starts to measure
+
+    Returns:
+        dict: Median, minimum and maximum import and ready times in seconds
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {"runs": runs}
+    for metric in ("import_seconds", "ready_seconds"):
+        values = [sample[metric] for sample in samples]
+        summary[metric] = {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4),
+        }
+    return summary
+
+
+def main() -> None:
+    """Run the startup benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Measure application cold-start time.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    args = parser.parse_args()
+
+    print(json.dumps(measure(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()